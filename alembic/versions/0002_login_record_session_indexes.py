@@ -0,0 +1,45 @@
+"""login record active-session indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+Composite (user_id, is_active, created_at) index for the active-session
+lookups, plus a partial index over active rows only on backends that
+support partial indexes (PostgreSQL, SQLite).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTIAL_INDEX_DIALECTS = {"postgresql", "sqlite"}
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_login_records_user_active_created",
+        "login_records",
+        ["user_id", "is_active", "created_at"],
+    )
+    if op.get_bind().dialect.name in PARTIAL_INDEX_DIALECTS:
+        op.create_index(
+            "ix_login_records_active_user_created",
+            "login_records",
+            ["user_id", "created_at"],
+            postgresql_where=sa.text("is_active = true"),
+            sqlite_where=sa.text("is_active = 1"),
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in PARTIAL_INDEX_DIALECTS:
+        op.drop_index("ix_login_records_active_user_created", table_name="login_records")
+    op.drop_index("ix_login_records_user_active_created", table_name="login_records")
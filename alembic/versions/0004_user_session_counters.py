@@ -0,0 +1,48 @@
+"""user session counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:05:00
+
+Denormalized active_session_count and last_login_at on users, backfilled
+from login_records.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(
+            sa.Column("active_session_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(sa.Column("last_login_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.execute(
+        """
+        UPDATE users SET
+            active_session_count = (
+                SELECT COUNT(*) FROM login_records
+                WHERE login_records.user_id = users.user_id AND login_records.is_active
+            ),
+            last_login_at = (
+                SELECT MAX(login_records.created_at) FROM login_records
+                WHERE login_records.user_id = users.user_id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("last_login_at")
+        batch_op.drop_column("active_session_count")
@@ -0,0 +1,31 @@
+"""login record keyset index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 12:30:00
+
+(user_id, created_at, id) index backing the keyset-paginated session
+listing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_login_records_user_created_id",
+        "login_records",
+        ["user_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_login_records_user_created_id", table_name="login_records")
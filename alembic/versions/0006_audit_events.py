@@ -0,0 +1,42 @@
+"""audit events
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:10:00
+
+Append-only table written by the audit event bus's database sink.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("ip_address", sa.String(length=45), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("details", sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_audit_events_event", "audit_events", ["event"], unique=False)
+    op.create_index("ix_audit_events_user_id", "audit_events", ["user_id"], unique=False)
+    op.create_index("ix_audit_events_created_at", "audit_events", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_events_created_at", table_name="audit_events")
+    op.drop_index("ix_audit_events_user_id", table_name="audit_events")
+    op.drop_index("ix_audit_events_event", table_name="audit_events")
+    op.drop_table("audit_events")
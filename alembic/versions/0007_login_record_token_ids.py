@@ -0,0 +1,32 @@
+"""login record token ids
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 15:10:00
+
+family_id and access_jti on login_records, so revoking one session can
+revoke its refresh-token family and its access tokens.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("login_records") as batch_op:
+        batch_op.add_column(sa.Column("family_id", sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column("access_jti", sa.String(length=36), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("login_records") as batch_op:
+        batch_op.drop_column("access_jti")
+        batch_op.drop_column("family_id")
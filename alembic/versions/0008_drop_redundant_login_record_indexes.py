@@ -0,0 +1,33 @@
+"""drop redundant login record indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 15:40:00
+
+login_records is written on every login, so every index on it costs
+write amplification. Two of its indexes are redundant:
+- the single-column user_id index, a prefix of the 0002 and 0005
+  composites (which also cover the foreign key);
+- the id index, which duplicates the primary key.
+The partial active-rows index from 0002 stays: it keeps active-session
+lookups independent of how many closed sessions a user has.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.drop_index("ix_login_records_user_id", table_name="login_records")
+    op.drop_index("ix_login_records_id", table_name="login_records")
+
+
+def downgrade() -> None:
+    op.create_index("ix_login_records_id", "login_records", ["id"], unique=False)
+    op.create_index("ix_login_records_user_id", "login_records", ["user_id"], unique=False)
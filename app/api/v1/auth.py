@@ -1,44 +1,73 @@
-from fastapi import APIRouter, Depends, Request, status
-from sqlalchemy.orm import Session
+import logging
+from uuid import uuid4
 
-from app.db.session import get_db
-from app.schemas.auth import UserCreate, UserLogin, UserLogout
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit import audit_bus, email_digest
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, get_db_async
+from app.schemas.auth import UserCreate, UserLogin
 from app.core.response import success_response, error_response
 from app.crud import auth as crud_auth, other as crud_other
 from app.core.dependencies import get_current_user
+from app.core.exceptions import EmailExists, ServiceBusy, TooManyRequests, UsernameExists
+from app.core.rate_limit import login_rate_limiter
 from app.utils.security import (
+    check_password_async,
     create_access_token,
     create_refresh_token,
-    verify_password,
+    hash_password_async,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Auth"])
 
-@router.post("/signup")
-def signup(request: Request, payload: UserCreate, db: Session = Depends(get_db)):
-    # Check for existing email/username
-    if crud_auth.get_user_by_email(db, payload.email):
-        return error_response("Email already exists", "EMAIL_EXISTS", 400)
-    if crud_auth.get_user_by_username(db, payload.username):
-        return error_response("Username already exists", "USERNAME_EXISTS", 400)
 
+async def _rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    # Runs after the login response is sent; on failure the next login simply tries again
+    try:
+        new_hash = await hash_password_async(password)
+    except ServiceBusy:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud_auth.update_password_hash_async(
+                db, user_id, old_hash=old_hash, new_hash=new_hash
+            )
+    except Exception:
+        logger.exception("password rehash failed for user %s", user_id)
+
+@router.post("/signup")
+async def signup(request: Request, payload: UserCreate, db: AsyncSession = Depends(get_db_async)):
     # Extract client IP address
     client_ip = request.client.host
 
-    user = crud_auth.create_user(
-        db,
-        username=payload.username,
-        email=payload.email,
-        phone_number=payload.phone_number,
-        password=payload.password,
-        ip_address=client_ip,
-        login_method=payload.login_method,
-    )
+    # bcrypt runs in the password process pool so the event loop stays free
+    password_hash = await hash_password_async(payload.password)
+
+    # Duplicate email/username is detected by the insert itself
+    try:
+        user = await crud_auth.create_user_async(
+            db,
+            username=payload.username,
+            email=payload.email,
+            phone_number=payload.phone_number,
+            password_hash=password_hash,
+            ip_address=client_ip,
+            login_method=payload.login_method,
+        )
+    except (EmailExists, UsernameExists) as exc:
+        return error_response(exc.message, exc.code, 400)
 
-    access_token, _ = create_access_token(str(user.user_id))
-    refresh_token = create_refresh_token(str(user.user_id))
+    # One id per session: the refresh-token family and the `sid` claim of its tokens
+    session_id = str(uuid4())
+    claims = {"username": user.username, "email": user.email, "sid": session_id}
+    access_token, access_jti = create_access_token(str(user.user_id), claims)
+    refresh_token, refresh_jti = create_refresh_token(str(user.user_id), claims)
 
-    crud_other.create_login_record(
+    await crud_other.create_login_record_async(
         db,
         user_id=user.user_id,
         username=user.username,
@@ -46,7 +75,11 @@ def signup(request: Request, payload: UserCreate, db: Session = Depends(get_db))
         login_method=payload.login_method,
         ip_address=client_ip,
         is_active=True,
+        family_id=session_id,
+        access_jti=access_jti,
+        refresh_jti=refresh_jti,
     )
+    audit_bus.publish("signup", user_id=user.user_id, ip_address=client_ip, login_method=payload.login_method)
 
     return success_response(
         message="User created successfully",
@@ -62,19 +95,45 @@ def signup(request: Request, payload: UserCreate, db: Session = Depends(get_db))
 
 
 @router.post("/login")
-def login(request: Request, payload: UserLogin, db: Session = Depends(get_db)):
-    user = crud_auth.get_user_by_email(db, payload.email)
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(
+    request: Request,
+    payload: UserLogin,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db_async),
+):
+    client_ip = request.client.host if request.client else None
+
+    # Throttle before the user lookup and bcrypt; raises TooManyRequests (429)
+    try:
+        await login_rate_limiter.check(client_ip, payload.email)
+    except TooManyRequests:
+        audit_bus.publish("login_throttled", ip_address=client_ip, email_hash=email_digest(payload.email))
+        raise
+
+    user = await crud_auth.get_user_by_email_async(db, payload.email)
+    if not user:
+        audit_bus.publish(
+            "login_failed", ip_address=client_ip, email_hash=email_digest(payload.email), reason="unknown_email"
+        )
+        return error_response("Invalid credentials", "INVALID_CREDENTIALS", 401)
+    valid, needs_update = await check_password_async(payload.password, user.password_hash)
+    if not valid:
+        audit_bus.publish("login_failed", user_id=user.user_id, ip_address=client_ip, reason="bad_password")
         return error_response("Invalid credentials", "INVALID_CREDENTIALS", 401)
 
-    # Create tokens
-    access_token, _ = create_access_token(str(user.user_id))
-    refresh_token = create_refresh_token(str(user.user_id))
+    # Hash made with an old work factor: upgrade it off the response path
+    if needs_update and settings.BCRYPT_REHASH_ON_LOGIN:
+        background_tasks.add_task(_rehash_password, user.user_id, payload.password, user.password_hash)
 
-    client_ip = request.client.host if request.client else None
+    # Create tokens
+    # One id per session: the refresh-token family and the `sid` claim of its tokens
+    session_id = str(uuid4())
+    claims = {"username": user.username, "email": user.email, "sid": session_id}
+    access_token, access_jti = create_access_token(str(user.user_id), claims)
+    refresh_token, refresh_jti = create_refresh_token(str(user.user_id), claims)
 
     # Create login record
-    crud_other.create_login_record(
+    await crud_other.create_login_record_async(
         db,
         user_id=user.user_id,
         username=user.username,
@@ -82,7 +141,11 @@ def login(request: Request, payload: UserLogin, db: Session = Depends(get_db)):
         login_method=payload.login_method,
         ip_address=client_ip,
         is_active=True,
+        family_id=session_id,
+        access_jti=access_jti,
+        refresh_jti=refresh_jti,
     )
+    audit_bus.publish("login", user_id=user.user_id, ip_address=client_ip, login_method=payload.login_method)
 
     return success_response(
         message="Login successful",
@@ -100,10 +163,16 @@ def login(request: Request, payload: UserLogin, db: Session = Depends(get_db)):
 async def logout(
     request: Request,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db_async)
 ):
     # Mark all active sessions for this user as logged out
-    sessions_closed = crud_other.logout_user(db, current_user["user_id"])
+    sessions_closed, _ = await crud_other.logout_user_async(db, current_user["user_id"])
+    audit_bus.publish(
+        "logout",
+        user_id=current_user["user_id"],
+        ip_address=request.client.host if request.client else None,
+        sessions_closed=sessions_closed,
+    )
     
     if sessions_closed == 0:
         return error_response(
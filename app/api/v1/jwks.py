@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request, Response
+
+from app.core.config import settings
+from app.utils.security import jwt_keyring
+
+router = APIRouter(tags=["Keys"])
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    """
+    Public keys for verifying our access tokens locally, matched by `kid`.
+    Empty while tokens are signed with the shared HS256 secret.
+    """
+    body, etag = jwt_keyring.jwks()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
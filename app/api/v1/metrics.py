@@ -0,0 +1,19 @@
+import hmac
+
+from fastapi import APIRouter, Header, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import render_prometheus
+from app.core.response import error_response
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: str | None = Header(None)):
+    # Latencies, error counts and pool stats are for the scraper only
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest((authorization or "").encode(), expected):
+        return error_response("Invalid metrics token", "INVALID_METRICS_TOKEN", status.HTTP_401_UNAUTHORIZED)
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, Request, status, HTTPException
+import base64
+import binascii
+import hmac
+import json
+import time
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, Query, Request, status, HTTPException
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from app.db.session import get_db
-from app.models.login_record import LoginRecord
-from app.schemas.other import TokenRefresh
+from app.core.audit import audit_bus
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.core.rate_limit import introspect_rate_limiter
+from app.core.revocation import revocation_list
+from app.db.routing import use_primary
+from app.db.session import get_db_async
+from app.schemas.other import TokenIntrospect, TokenRefresh
+from app.core.exceptions import RefreshTokenReused
 from app.core.response import success_response, error_response
-from app.crud import auth as crud_auth, other as crud_other
+from app.crud import auth as crud_auth, other as crud_other, refresh_token as crud_refresh
 from app.core.dependencies import get_current_user
 from app.utils.security import (
     create_access_token,
@@ -19,9 +32,9 @@ router = APIRouter(tags=["Auth"])
 
 
 @router.post("/refresh")
-def refresh_token(
+async def refresh_token(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db_async),
     payload: TokenRefresh = Depends()
 ):
     # Get the Authorization header
@@ -40,24 +53,38 @@ def refresh_token(
         if payload_data.get("type") != "refresh":
             return error_response("Invalid token type", "INVALID_TOKEN", 401)
         
-        # Get user ID from token
+        # Get user ID and token id from token
         user_id = payload_data.get("sub")
-        if not user_id:
+        jti = payload_data.get("jti")
+        if not user_id or not jti:
             return error_response("Invalid token", "INVALID_TOKEN", 401)
-        
-        # Get user from database
-        user = crud_auth.get_user_by_id(db, int(user_id))
-        if not user:
-            return error_response("User not found", "USER_NOT_FOUND", 404)
-
-        # Check for an active session (logout should disable refresh as well)
-        active_record = crud_other.get_active_login_record(db, user.user_id)
-        if not active_record:
-            return error_response("No active session found", "NO_ACTIVE_SESSIONS", 401)
-
-        # Create new tokens
-        access_token, _ = create_access_token(str(user.user_id))
-        refresh_token = create_refresh_token(str(user.user_id))
+
+        # Logout on another worker may predate the write-behind flush that stores
+        # this token, so its DB revocation can miss it; the user epoch doesn't
+        if revocation_list.is_revoked(payload_data):
+            return error_response("Refresh token has been revoked", "TOKEN_REVOKED", 401)
+
+        claims = {"username": payload_data.get("username"), "email": payload_data.get("email")}
+        if payload_data.get("sid"):
+            # The session id carries over, so revoking the session covers these tokens too
+            claims["sid"] = payload_data["sid"]
+        refresh_token, refresh_jti = create_refresh_token(user_id, claims)
+
+        # Consume the presented token and store its replacement in one transaction.
+        # Logout revokes the stored tokens, so no user/session lookup is needed;
+        # InvalidToken / RefreshTokenReused propagate to the AppException handler.
+        client_ip = request.client.host if request.client else None
+        try:
+            await crud_refresh.rotate_refresh_token_async(db, jti=jti, new_jti=refresh_jti)
+        except RefreshTokenReused:
+            # The family is revoked; end the session too so its access tokens stop working
+            if payload_data.get("sid"):
+                await crud_other.revoke_session_async(db, family_id=payload_data["sid"], user_id=int(user_id))
+            audit_bus.publish("refresh_reuse", user_id=int(user_id), ip_address=client_ip, jti=jti)
+            raise
+
+        access_token, _ = create_access_token(user_id, claims)
+        audit_bus.publish("refresh", user_id=int(user_id), ip_address=client_ip)
         
         return success_response(
             message="Tokens refreshed successfully",
@@ -77,40 +104,195 @@ def refresh_token(
 @router.get("/me", response_model=Dict[str, Any])
 async def get_current_user_data(
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db_async)
 ):
     """
     Get the current authenticated user's data.
     Requires a valid access token in the Authorization header.
     """
     # Get the full user data from the database
-    user = crud_auth.get_user_by_id(db, current_user["user_id"])
+    user = await crud_auth.get_user_by_id_async(db, current_user["user_id"])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Get the user's active login records
-    active_sessions = db.query(LoginRecord).filter(
-        LoginRecord.user_id == user.user_id,
-        LoginRecord.is_active == True
-    ).all()
+    # Session count and last login come from the user row itself
+    active_sessions, last_login = crud_other.get_session_summary(user)
     
-    # Prepare the response with serializable data types
+    # Datetimes are encoded by the response class
     user_data = {
         "user_id": user.user_id,
         "username": user.username,
         "email": user.email,
         "phone_number": user.phone_number,
         "login_method": user.login_method,
-        "created_at": user.created_at.isoformat() if user.created_at else None,
-        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
-        "active_sessions": len(active_sessions),
-        "last_login": active_sessions[0].created_at.isoformat() if active_sessions else None
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+        "active_sessions": active_sessions,
+        "last_login": last_login
     }
     
     return success_response(
         message="User data retrieved successfully",
         data=user_data
     )
+
+
+def _encode_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+@router.get("/sessions")
+async def list_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    active: bool | None = Query(None, description="only active (true) or ended (false) sessions"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_async),
+):
+    """
+    List the current user's sessions, newest first.
+    Pages are cursor-based: pass `next_cursor` back as `cursor` until it is null.
+    Logins still queued by the write-behind writer show up once flushed.
+    """
+    after = None
+    if cursor is not None:
+        after = _decode_cursor(cursor)
+        if after is None:
+            return error_response("Invalid cursor", "INVALID_CURSOR", status.HTTP_400_BAD_REQUEST)
+
+    # One extra row tells us whether another page exists
+    rows = await crud_other.list_login_records_async(
+        db, current_user["user_id"], limit=limit + 1, after=after, is_active=active
+    )
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+    return success_response(
+        message="Sessions retrieved successfully",
+        data={
+            "sessions": [dict(row._mapping) for row in page],
+            "next_cursor": next_cursor,
+        },
+    )
+
+
+@router.delete("/sessions/{session_id}")
+async def revoke_session(
+    session_id: int,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_async),
+):
+    """
+    End one of the current user's sessions: its refresh tokens and access
+    tokens stop working. Other users' sessions are reported as not found.
+    """
+    record = await crud_other.revoke_login_record_async(db, id=session_id, user_id=current_user["user_id"])
+    if record is None:
+        return error_response("Session not found", "SESSION_NOT_FOUND", status.HTTP_404_NOT_FOUND)
+    audit_bus.publish("session_revoked", user_id=current_user["user_id"], session_id=record.id)
+
+    return success_response(
+        message="Session revoked successfully",
+        data={"id": record.id, "is_active": record.is_active, "logged_out_at": record.logged_out_at},
+    )
+
+
+INTROSPECT_API_KEYS = [key.strip() for key in settings.INTROSPECT_API_KEYS.split(",") if key.strip()]
+
+
+def _introspect_claims(token: str) -> tuple[Dict[str, Any] | None, str | None]:
+    # (payload, None) for a usable access token, else (None, error code)
+    try:
+        payload = decode_token(token)
+    except jwt.ExpiredSignatureError:
+        return None, "TOKEN_EXPIRED"
+    except jwt.InvalidTokenError:
+        return None, "INVALID_TOKEN"
+    if payload.get("type") != "access" or not str(payload.get("sub", "")).isdigit():
+        return None, "INVALID_TOKEN"
+    if revocation_list.is_revoked(payload):
+        return None, "TOKEN_REVOKED"
+    return payload, None
+
+
+@router.post("/introspect")
+async def introspect_tokens(
+    body: TokenIntrospect,
+    x_api_key: str | None = Header(None),
+    db: AsyncSession = Depends(get_db_async),
+):
+    """
+    Validate a batch of access tokens in one call, for gateways and internal services.
+    Results are in request order; users are resolved with one IN query in total.
+    """
+    if not INTROSPECT_API_KEYS:
+        # Without keys anyone could probe tokens and read their users' details
+        return error_response("Introspection is not enabled", "INTROSPECT_DISABLED", status.HTTP_403_FORBIDDEN)
+    if not any(hmac.compare_digest(x_api_key or "", key) for key in INTROSPECT_API_KEYS):
+        return error_response("Invalid API key", "INVALID_API_KEY", status.HTTP_401_UNAUTHORIZED)
+
+    # Each call can cost hundreds of signature checks; raises TooManyRequests (429)
+    await introspect_rate_limiter.check(f"key:{x_api_key}")
+
+    decoded = [_introspect_claims(token) for token in body.tokens]
+    user_ids = {int(payload["sub"]) for payload, _ in decoded if payload is not None}
+
+    # Same sources as get_current_user: claims only when stateless, else cache then DB
+    principals: Dict[int, tuple[Dict[str, Any], bool] | None] = {}
+    if not settings.ACCESS_TOKEN_STATELESS:
+        missing = []
+        for user_id in user_ids:
+            cached = principal_cache.get(user_id)
+            if cached is None:
+                missing.append(user_id)
+            else:
+                principals[user_id] = cached
+        if missing:
+            now = time.time()
+            if any(
+                payload is not None and now - payload.get("iat", 0) < settings.DB_REPLICA_STALENESS_SECONDS
+                for payload, _ in decoded
+            ):
+                use_primary(db)
+            for row in await crud_auth.get_users_by_ids_async(db, missing):
+                principal = {"user_id": row.user_id, "username": row.username, "email": row.email}
+                entry = (principal, crud_other.has_active_session(row.user_id, row.active_session_count))
+                principal_cache.set(row.user_id, entry)
+                principals[row.user_id] = entry
+
+    results = []
+    for payload, error in decoded:
+        if payload is None:
+            results.append({"active": False, "error": error})
+            continue
+        user_id = int(payload["sub"])
+        if settings.ACCESS_TOKEN_STATELESS:
+            principal = {"user_id": user_id, "username": payload.get("username"), "email": payload.get("email")}
+        else:
+            entry = principals.get(user_id)
+            if entry is None:
+                results.append({"active": False, "error": "USER_NOT_FOUND"})
+                continue
+            principal, has_active = entry
+            if not has_active:
+                results.append({"active": False, "error": "NO_ACTIVE_SESSION"})
+                continue
+        results.append({**principal, "active": True, "jti": payload.get("jti"), "exp": payload.get("exp")})
+
+    return success_response(
+        message="Tokens introspected successfully",
+        data={"results": results},
+    )
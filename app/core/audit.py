@@ -0,0 +1,336 @@
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Protocol
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.response import json_dumps
+from app.models.audit_event import AuditEvent as AuditEventRow
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest")
+
+
+@dataclass
+class AuditEvent:
+    event: str
+    user_id: int | None = None
+    ip_address: str | None = None
+    details: Dict[str, Any] | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class AuditSink(Protocol):
+    name: str
+
+    async def write(self, batch: list[AuditEvent]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def email_digest(email: str) -> str:
+    """Keyed digest of a submitted email, so failed logins correlate without storing the address."""
+    key = (settings.AUDIT_HASH_KEY or settings.JWT_SECRET_KEY).encode()
+    return hmac.new(key, email.strip().lower().encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def _ndjson(batch: list[AuditEvent]) -> bytes:
+    return b"".join(json_dumps(asdict(event)) + b"\n" for event in batch)
+
+
+class DatabaseAuditSink:
+    """Inserts each batch into audit_events with one executemany."""
+
+    name = "db"
+
+    async def write(self, batch: list[AuditEvent]) -> None:
+        # Imported here so the bus itself doesn't pull in the engines
+        from app.db.session import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AuditEventRow), [asdict(event) for event in batch])
+            await db.commit()
+
+    async def close(self) -> None:
+        pass
+
+
+class NDJSONFileSink:
+    """Append-only NDJSON files, rotated by size, fsynced at most every `fsync_interval`.
+
+    `{worker}` in the path becomes the lowest slot number no live process
+    holds (an flock on `<file>.lock`). Every worker gets its own file, so
+    workers never interleave writes or race each other's rotation, and a
+    restarted worker takes over a freed slot. Disk use therefore stays at
+    most workers x (backup_count + 1) files.
+    """
+
+    name = "file"
+
+    def __init__(self, path: str, *, max_bytes: int, backup_count: int, fsync_interval: float):
+        self.path_template = path
+        self.path: str | None = None
+        self._slot_lock = None
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_fsync = 0.0
+        self.rotations = 0
+        self.fsyncs = 0
+
+    def _claim_path(self) -> str:
+        if "{worker}" not in self.path_template:
+            return self.path_template
+        for slot in itertools.count():
+            path = self.path_template.format(worker=slot)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            lock_file = open(f"{path}.lock", "a")
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue  # held by another live worker
+            # Released by the OS if this process dies
+            self._slot_lock = lock_file
+            return path
+
+    def _open(self) -> None:
+        if self.path is None:
+            self.path = self._claim_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+
+    def _rotate(self) -> None:
+        self._sync()
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self._open()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self.fsyncs += 1
+
+    def _write(self, data: bytes) -> None:
+        if self._file is None:
+            self._open()
+        if self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._sync()
+
+    async def write(self, batch: list[AuditEvent]) -> None:
+        await asyncio.to_thread(self._write, _ndjson(batch))
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+        if self._slot_lock is not None:
+            self._slot_lock.close()
+            self._slot_lock = None
+            self.path = None
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+
+class StdoutAuditSink:
+    """NDJSON on stdout for container log collectors."""
+
+    name = "stdout"
+
+    def _write(self, data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+
+    async def write(self, batch: list[AuditEvent]) -> None:
+        # A stalled log collector blocks the write; keep that off the event loop
+        await asyncio.to_thread(self._write, _ndjson(batch))
+
+    async def close(self) -> None:
+        pass
+
+
+class AuditBus:
+    """Fire-and-forget audit events, delivered to the sinks by a background task.
+
+    `publish()` only appends to a bounded queue and never waits. When the
+    queue is full the overflow policy applies: "drop_new" drops the event
+    being published, "drop_oldest" drops the oldest queued one. Events are
+    written in batches of up to `batch_size`, at least every
+    `flush_interval` seconds; a failing sink is logged and counted without
+    holding up the others. `stop()` drains the queue before returning.
+    """
+
+    def __init__(
+        self,
+        sinks: list[AuditSink],
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow: str = "drop_new",
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown audit overflow policy {overflow!r}")
+        self.sinks = sinks
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._accepting = False
+
+        self.published = 0
+        self.dropped = 0
+        self.batches = 0
+        self.delivered = {sink.name: 0 for sink in sinks}
+        self.failures = {sink.name: 0 for sink in sinks}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.sinks or self.running:
+            return
+        # One slot more than max_queue, so the stop marker always fits
+        self._queue = asyncio.Queue(maxsize=self.max_queue + 1)
+        self._accepting = True
+        self._task = asyncio.create_task(self._run(), name="audit-bus")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._accepting = False
+        self._queue.put_nowait(_STOP)
+        await self._task
+        self._task = None
+        for sink in self.sinks:
+            await sink.close()
+
+    def publish(self, event: str, *, user_id: int | None = None, ip_address: str | None = None, **details: Any) -> None:
+        if not self._accepting:
+            return
+        item = AuditEvent(event, user_id, ip_address, details or None)
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            if self.overflow == "drop_new":
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(item)
+        self.published += 1
+
+    def _drain_into(self, batch: list) -> bool:
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            stopping = item is _STOP
+            batch = [] if stopping else [item]
+            if not stopping:
+                stopping = self._drain_into(batch)
+                if not stopping and len(batch) < self.batch_size:
+                    await asyncio.sleep(self.flush_interval)
+                    stopping = self._drain_into(batch)
+            if batch:
+                await self._deliver(batch)
+            if stopping:
+                return
+
+    async def _deliver(self, batch: list[AuditEvent]) -> None:
+        self.batches += 1
+        for sink in self.sinks:
+            try:
+                await sink.write(batch)
+                self.delivered[sink.name] += len(batch)
+            except Exception:
+                self.failures[sink.name] += 1
+                logger.exception("audit sink %s failed to write %d events", sink.name, len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "published": self.published,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+        for name in self.delivered:
+            stats[f"{name}_delivered"] = self.delivered[name]
+            stats[f"{name}_failures"] = self.failures[name]
+        return stats
+
+
+def _build_sinks() -> list[AuditSink]:
+    sinks: list[AuditSink] = []
+    for name in (part.strip() for part in settings.AUDIT_SINKS.split(",")):
+        if name == "db":
+            sinks.append(DatabaseAuditSink())
+        elif name == "file":
+            sinks.append(NDJSONFileSink(
+                settings.AUDIT_FILE_PATH,
+                max_bytes=settings.AUDIT_FILE_MAX_BYTES,
+                backup_count=settings.AUDIT_FILE_BACKUPS,
+                fsync_interval=settings.AUDIT_FSYNC_INTERVAL_SECONDS,
+            ))
+        elif name == "stdout":
+            sinks.append(StdoutAuditSink())
+        elif name:
+            raise ValueError(f"unknown audit sink {name!r}")
+    return sinks
+
+
+audit_bus = AuditBus(
+    _build_sinks(),
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+    overflow=settings.AUDIT_OVERFLOW,
+)
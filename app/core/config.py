@@ -4,13 +4,139 @@ from pydantic import Field
 
 class Settings(BaseSettings):
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    # Derived from DATABASE_URL (aiosqlite / asyncpg) when not set
+    ASYNC_DATABASE_URL: str | None = Field(None, env="ASYNC_DATABASE_URL")
+
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = Field(5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    DB_POOL_TIMEOUT: float = Field(30.0, env="DB_POOL_TIMEOUT")
+
+    # Comma-separated read replicas for the async request path (empty = primary only).
+    # Reads stay on the primary for DB_REPLICA_STALENESS_SECONDS after a write in the
+    # same session, and for tokens issued less than that long ago
+    DATABASE_REPLICA_URLS: str = Field("", env="DATABASE_REPLICA_URLS")
+    DB_REPLICA_STALENESS_SECONDS: float = Field(2.0, env="DB_REPLICA_STALENESS_SECONDS")
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = Field(10.0, env="DB_REPLICA_HEALTH_INTERVAL_SECONDS")
+
+    # SQLite connection pragmas
+    SQLITE_JOURNAL_MODE: str = Field("WAL", env="SQLITE_JOURNAL_MODE")
+    SQLITE_SYNCHRONOUS: str = Field("NORMAL", env="SQLITE_SYNCHRONOUS")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    SQLITE_MMAP_SIZE: int = Field(256 * 1024 * 1024, env="SQLITE_MMAP_SIZE")
+    SQLITE_CACHE_SIZE: int = Field(-64000, env="SQLITE_CACHE_SIZE")  # negative = KiB
     JWT_SECRET_KEY: str = Field(..., env="JWT_SECRET_KEY")
+    # HS256 (shared secret) | EdDSA | ES256. Asymmetric keys are PEM files in JWT_KEY_DIR
+    # named <kid>.pem (private) or <kid>.pub.pem (verify-only); see generate_jwt_key.py
+    JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")
+    JWT_KEY_DIR: str = Field("./keys", env="JWT_KEY_DIR")
+    JWT_ACTIVE_KID: str | None = Field(None, env="JWT_ACTIVE_KID")
+    # Migration only: keep accepting kid-less HS256 tokens after switching to an asymmetric
+    # algorithm. Anyone holding JWT_SECRET_KEY can mint them, so turn it on for the switch
+    # and off again once the old refresh tokens have expired (REFRESH_TOKEN_EXPIRE_DAYS)
+    JWT_ACCEPT_HS256: bool = Field(False, env="JWT_ACCEPT_HS256")
+    JWKS_MAX_AGE_SECONDS: int = Field(300, env="JWKS_MAX_AGE_SECONDS")
     DEBUG: bool = Field(True, env="DEBUG")
 
     APP_ENV: str = Field("development", env="APP_ENV")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(60, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(7, env="REFRESH_TOKEN_EXPIRE_DAYS")
 
+    # Expired refresh tokens are purged in batches this often (0 disables the in-app purge)
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = Field(3600, env="REFRESH_TOKEN_PURGE_INTERVAL_SECONDS")
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = Field(1000, env="REFRESH_TOKEN_PURGE_BATCH_SIZE")
+
+    # Login record retention: archive + delete inactive records older than the max age
+    RETENTION_MAX_AGE_DAYS: int = Field(90, env="RETENTION_MAX_AGE_DAYS")
+    RETENTION_CHUNK_SIZE: int = Field(1000, env="RETENTION_CHUNK_SIZE")
+    RETENTION_ARCHIVE_DIR: str = Field("./archive", env="RETENTION_ARCHIVE_DIR")
+    RETENTION_ARCHIVE_FORMAT: str = Field("jsonl", env="RETENTION_ARCHIVE_FORMAT")  # jsonl | parquet
+    RETENTION_CHECKPOINT_PATH: str = Field("./archive/retention.checkpoint.json", env="RETENTION_CHECKPOINT_PATH")
+    RETENTION_MAX_BATCH_SECONDS: float = Field(0.5, env="RETENTION_MAX_BATCH_SECONDS")
+    RETENTION_PAUSE_RATIO: float = Field(1.0, env="RETENTION_PAUSE_RATIO")
+    RETENTION_INTERVAL_SECONDS: int = Field(0, env="RETENTION_INTERVAL_SECONDS")  # 0 = CLI only
+
+    # Validate access tokens by signature/expiry plus the revocation list only (no DB lookup).
+    # The revocation list (logout, session revocation) is checked in either mode; with it
+    # disabled, revoked access tokens stay valid until they expire
+    ACCESS_TOKEN_STATELESS: bool = Field(False, env="ACCESS_TOKEN_STATELESS")
+    REVOCATION_LIST_ENABLED: bool = Field(True, env="REVOCATION_LIST_ENABLED")
+    REVOCATION_LIST_PATH: str = Field("./revocations.log", env="REVOCATION_LIST_PATH")
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = Field(1.0, env="REVOCATION_SYNC_INTERVAL_SECONDS")
+    REVOCATION_LIST_COMPACT_BYTES: int = Field(1024 * 1024, env="REVOCATION_LIST_COMPACT_BYTES")
+
+    # Boot-time Alembic revision check: warn | strict | off. Migrations themselves
+    # run once per deploy via prestart.py, never from the workers
+    DB_SCHEMA_CHECK: str = Field("warn", env="DB_SCHEMA_CHECK")
+
+    # POST /auth/introspect: tokens per call, and the X-API-Key values allowed to call it
+    # (comma-separated; with none configured the endpoint is refused)
+    INTROSPECT_MAX_TOKENS: int = Field(500, env="INTROSPECT_MAX_TOKENS")
+    INTROSPECT_API_KEYS: str = Field("", env="INTROSPECT_API_KEYS")
+    # Calls per API key (or client IP without one) per window, on the login throttle's backend
+    INTROSPECT_RATE_LIMIT_PER_CALLER: int = Field(60, env="INTROSPECT_RATE_LIMIT_PER_CALLER")
+    INTROSPECT_RATE_LIMIT_WINDOW_SECONDS: int = Field(60, env="INTROSPECT_RATE_LIMIT_WINDOW_SECONDS")
+
+    # Audit event bus: comma-separated sinks out of db, file, stdout (empty disables it).
+    # Overflow when the queue is full: drop_new | drop_oldest
+    AUDIT_SINKS: str = Field("db,file", env="AUDIT_SINKS")
+    AUDIT_QUEUE_SIZE: int = Field(10000, env="AUDIT_QUEUE_SIZE")
+    AUDIT_BATCH_SIZE: int = Field(500, env="AUDIT_BATCH_SIZE")
+    AUDIT_FLUSH_INTERVAL_MS: int = Field(200, env="AUDIT_FLUSH_INTERVAL_MS")
+    AUDIT_OVERFLOW: str = Field("drop_new", env="AUDIT_OVERFLOW")
+    # HMAC key for the email digests in failed-login events (defaults to JWT_SECRET_KEY);
+    # the submitted address itself is never written
+    AUDIT_HASH_KEY: str | None = Field(None, env="AUDIT_HASH_KEY")
+    # {worker} is a per-worker slot number reused across restarts, so the file set stays bounded
+    AUDIT_FILE_PATH: str = Field("./audit/audit-{worker}.ndjson", env="AUDIT_FILE_PATH")
+    AUDIT_FILE_MAX_BYTES: int = Field(64 * 1024 * 1024, env="AUDIT_FILE_MAX_BYTES")
+    AUDIT_FILE_BACKUPS: int = Field(10, env="AUDIT_FILE_BACKUPS")
+    AUDIT_FSYNC_INTERVAL_SECONDS: float = Field(1.0, env="AUDIT_FSYNC_INTERVAL_SECONDS")
+
+    # Request metrics middleware and /metrics endpoint. The endpoint is only mounted with
+    # a METRICS_TOKEN, which scrapers send as `Authorization: Bearer <token>`
+    METRICS_ENABLED: bool = Field(True, env="METRICS_ENABLED")
+    METRICS_TOKEN: str | None = Field(None, env="METRICS_TOKEN")
+    SERVER_TIMING_HEADER: bool = Field(False, env="SERVER_TIMING_HEADER")
+
+    # JSON encoder for responses: auto | orjson | msgspec | json
+    JSON_RESPONSE_BACKEND: str = Field("auto", env="JSON_RESPONSE_BACKEND")
+    # Exception text and full validation errors (with the rejected input) in error
+    # responses. Off by default: it leaks internals and costs formatting per error
+    ERROR_DETAILS: bool = Field(False, env="ERROR_DETAILS")
+
+    # bcrypt work factor; pick it per host with calibrate_bcrypt.py. Hashes with other
+    # rounds still verify and are rehashed in the background on the next login
+    BCRYPT_ROUNDS: int = Field(12, env="BCRYPT_ROUNDS")
+    BCRYPT_REHASH_ON_LOGIN: bool = Field(True, env="BCRYPT_REHASH_ON_LOGIN")
+
+    # Login throttling per client IP and per email, checked before any DB or bcrypt work.
+    # Backend: memory (per worker) | sqlite (shared by the workers on one host) | off
+    LOGIN_RATE_LIMIT_BACKEND: str = Field("memory", env="LOGIN_RATE_LIMIT_BACKEND")
+    LOGIN_RATE_LIMIT_PER_IP: int = Field(30, env="LOGIN_RATE_LIMIT_PER_IP")
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = Field(10, env="LOGIN_RATE_LIMIT_PER_EMAIL")
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = Field(60, env="LOGIN_RATE_LIMIT_WINDOW_SECONDS")
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = Field(100_000, env="LOGIN_RATE_LIMIT_MAX_KEYS")
+    LOGIN_RATE_LIMIT_SQLITE_PATH: str = Field("./rate_limits.db", env="LOGIN_RATE_LIMIT_SQLITE_PATH")
+
+    # Password hashing process pool (0 workers = one per CPU core)
+    PASSWORD_POOL_SIZE: int = Field(0, env="PASSWORD_POOL_SIZE")
+    PASSWORD_POOL_MAX_QUEUE: int = Field(64, env="PASSWORD_POOL_MAX_QUEUE")
+    PASSWORD_POOL_START_METHOD: str = Field("spawn", env="PASSWORD_POOL_START_METHOD")
+
+    # Authenticated-principal cache used by get_current_user (0 disables it)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = Field(30.0, env="PRINCIPAL_CACHE_TTL_SECONDS")
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(10000, env="PRINCIPAL_CACHE_MAX_ENTRIES")
+
+    # Write-behind batching of login record inserts
+    LOGIN_RECORD_WRITE_BEHIND: bool = Field(False, env="LOGIN_RECORD_WRITE_BEHIND")
+    LOGIN_RECORD_BATCH_SIZE: int = Field(200, env="LOGIN_RECORD_BATCH_SIZE")
+    LOGIN_RECORD_FLUSH_INTERVAL_MS: int = Field(50, env="LOGIN_RECORD_FLUSH_INTERVAL_MS")
+    LOGIN_RECORD_QUEUE_SIZE: int = Field(10000, env="LOGIN_RECORD_QUEUE_SIZE")
+    LOGIN_RECORD_ENQUEUE_TIMEOUT_MS: int = Field(100, env="LOGIN_RECORD_ENQUEUE_TIMEOUT_MS")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
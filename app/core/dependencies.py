@@ -1,20 +1,27 @@
+import time
+
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from app.db.session import get_db
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.core.exceptions import InvalidToken, NoActiveSession, TokenExpired, TokenRevoked
+from app.core.revocation import revocation_list
+from app.db.routing import use_primary
+from app.db.session import get_db_async
 from app.crud import auth as crud_auth, other as crud_other
 from app.utils.security import decode_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
+async def get_current_user(
     request: Request,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db_async),
 ) -> Dict[str, Any]:
     try:
         # Decode the token
@@ -22,41 +29,56 @@ def get_current_user(
         user_id = payload.get("sub")
         
         if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload"
-            )
-
-        # Get user from database
-        user = crud_auth.get_user_by_id(db, int(user_id))
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-
-        # Check if user has any active sessions
-        active_record = crud_other.get_active_login_record(db, user.user_id)
-        if not active_record:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="No active session found"
-            )
-
-        # Return user data
-        return {
-            "user_id": user.user_id,
-            "username": user.username,
-            "email": user.email
-        }
+            raise InvalidToken("Invalid token payload")
+
+        # A refresh token is not a bearer credential, whichever mode validates it
+        if payload.get("type") != "access":
+            raise InvalidToken("Invalid token type")
+
+        if revocation_list.is_revoked(payload):
+            raise TokenRevoked()
+
+        if settings.ACCESS_TOKEN_STATELESS:
+            # CPU-only path: signature and expiry were checked by decode_token
+            return {
+                "user_id": int(user_id),
+                "username": payload.get("username"),
+                "email": payload.get("email")
+            }
+
+        # Warm cache: no DB round trip at all
+        cached = principal_cache.get(int(user_id))
+        if cached is None:
+            # A token this fresh may belong to a login the replicas haven't seen yet
+            if time.time() - payload.get("iat", 0) < settings.DB_REPLICA_STALENESS_SECONDS:
+                use_primary(db)
+
+            # Get user from database
+            user = await crud_auth.get_user_by_id_async(db, int(user_id))
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+
+            # Check if user has any active sessions
+            active_record = await crud_other.get_active_login_record_async(db, user.user_id)
+            principal = {
+                "user_id": user.user_id,
+                "username": user.username,
+                "email": user.email
+            }
+            cached = (principal, active_record is not None)
+            principal_cache.set(user.user_id, cached)
+
+        principal, has_active_session = cached
+        if not has_active_session:
+            raise NoActiveSession()
+
+        # Return a copy so callers can't mutate the cached entry
+        return dict(principal)
 
     except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
-        )
+        raise TokenExpired()
     except jwt.InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
+        raise InvalidToken()
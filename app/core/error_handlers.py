@@ -1,25 +1,57 @@
+import logging
+import re
+
 from fastapi import Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from fastapi import status, HTTPException
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-import json
-from datetime import datetime
-from typing import Any
+from sqlalchemy.exc import DBAPIError, IntegrityError, SQLAlchemyError
 
+from .config import settings
 from .response import error_response
 from .exceptions import AppException
 
+logger = logging.getLogger(__name__)
+
+# Raised by our stdlib encoder ("Object of type X is ...") and by orjson ("Type is ...")
+JSON_ENCODE_ERROR = re.compile(r"(Object of type \w+|Type) is not JSON serializable")
+
+
+def _validation_details(exc: RequestValidationError) -> list:
+    if settings.ERROR_DETAILS:
+        # Includes the rejected input and validator context
+        return jsonable_encoder(exc.errors())
+    return [{"loc": error["loc"], "msg": error["msg"], "type": error["type"]} for error in exc.errors()]
+
+
+def _database_details(exc: SQLAlchemyError) -> str | None:
+    if not settings.ERROR_DETAILS:
+        return None
+    # The driver's message only; str(exc) would append the SQL statement and parameters
+    if isinstance(exc, DBAPIError) and exc.orig is not None:
+        return f"{type(exc.orig).__name__}: {exc.orig}"
+    return type(exc).__name__
+
+
 def register_exception_handlers(app):
     @app.exception_handler(AppException)
     async def app_exception_handler(request: Request, exc: AppException):
-        return error_response(error=exc.message, code=exc.code, status_code=exc.status_code, details=exc.details)
+        return error_response(
+            error=exc.message,
+            code=exc.code,
+            status_code=exc.status_code,
+            details=exc.details,
+            headers=getattr(exc, "headers", None),
+        )
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
-        # You can format as you prefer
-        details = exc.errors()
-        return error_response(error="Validation error", code="VALIDATION_ERROR", status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, details=details)
+        return error_response(
+            error="Validation error",
+            code="VALIDATION_ERROR",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            details=_validation_details(exc),
+        )
 
     @app.exception_handler(IntegrityError)
     async def sqlalchemy_integrity_error(request: Request, exc: IntegrityError):
@@ -32,34 +64,40 @@ def register_exception_handlers(app):
             error=exc.detail,
             code=getattr(exc, "code", "HTTP_ERROR"),
             status_code=exc.status_code,
-            details=getattr(exc, "details", None)
+            details=getattr(exc, "details", None),
+            headers=exc.headers,
         )
-        
+
     @app.exception_handler(TypeError)
     async def json_encode_error_handler(request: Request, exc: TypeError):
-        if "Object of type.*is not JSON serializable" in str(exc):
-            return error_response(
-                error="Error encoding response data",
-                code="JSON_ENCODE_ERROR",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                details=str(exc)
-            )
-        raise exc  # Re-raise if it's not a JSON serialization error
-        
+        message = str(exc)
+        if not JSON_ENCODE_ERROR.search(message):
+            raise exc  # Not a serialization error: the generic handler reports it
+        logger.error("error encoding response for %s %s: %s", request.method, request.url.path, message)
+        return error_response(
+            error="Error encoding response data",
+            code="JSON_ENCODE_ERROR",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            details=message if settings.ERROR_DETAILS else None,
+        )
+
     @app.exception_handler(SQLAlchemyError)
     async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
+        # The statement goes to the log, never to the client
+        logger.exception("database error on %s %s", request.method, request.url.path)
         return error_response(
             error="Database error occurred",
             code="DATABASE_ERROR",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            details=str(exc)
+            details=_database_details(exc),
         )
-        
+
     @app.exception_handler(Exception)
     async def generic_exception_handler(request: Request, exc: Exception):
+        # Starlette re-raises after this response, so the server logs the traceback
         return error_response(
             error="An unexpected error occurred",
             code="INTERNAL_SERVER_ERROR",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            details=str(exc) if str(exc) else None
+            details=(str(exc) or None) if settings.ERROR_DETAILS else None,
         )
@@ -18,3 +18,32 @@ class PhoneExists(AppException):
 class UsernameExists(AppException):
     def __init__(self, message: str = "Username already exists"):
         super().__init__(message=message, code="USERNAME_EXISTS", status_code=409)
+
+class ServiceBusy(AppException):
+    def __init__(self, message: str = "Server is busy, please retry"):
+        super().__init__(message=message, code="SERVER_BUSY", status_code=503)
+
+class InvalidToken(AppException):
+    def __init__(self, message: str = "Invalid token"):
+        super().__init__(message=message, code="INVALID_TOKEN", status_code=401)
+
+class TokenExpired(AppException):
+    def __init__(self, message: str = "Token has expired"):
+        super().__init__(message=message, code="TOKEN_EXPIRED", status_code=401)
+
+class TokenRevoked(AppException):
+    def __init__(self, message: str = "Token has been revoked"):
+        super().__init__(message=message, code="TOKEN_REVOKED", status_code=401)
+
+class NoActiveSession(AppException):
+    def __init__(self, message: str = "No active session found"):
+        super().__init__(message=message, code="NO_ACTIVE_SESSION", status_code=401)
+
+class RefreshTokenReused(AppException):
+    def __init__(self, message: str = "Refresh token reuse detected; session revoked"):
+        super().__init__(message=message, code="REFRESH_TOKEN_REUSED", status_code=401)
+
+class TooManyRequests(AppException):
+    def __init__(self, retry_after: int, message: str = "Too many attempts, please retry later"):
+        super().__init__(message=message, code="TOO_MANY_REQUESTS", status_code=429, details={"retry_after": retry_after})
+        self.headers = {"Retry-After": str(retry_after)}
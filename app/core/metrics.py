@@ -0,0 +1,209 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Sequence
+
+# Seconds; tuned for things that normally finish in well under a second
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus two additions."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = [], 0
+        for upper, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative.append((upper, running))
+        return {"buckets": cumulative, "sum": total, "count": running}
+
+
+class LabeledHistogram:
+    """A family of histograms, one child per distinct label value tuple."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.name, self.documentation, self.buckets))
+        return child
+
+    def children(self) -> list[tuple[tuple, Histogram]]:
+        return list(self._children.items())
+
+
+class LabeledCounter:
+    """Monotonic counters, one per distinct label value tuple."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def children(self) -> list[tuple[tuple, int]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+REGISTRY: Dict[str, Histogram | LabeledHistogram | LabeledCounter] = {}
+# prefix -> callable returning a flat dict of numbers, rendered as gauges
+STATS_PROVIDERS: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+    labelnames: Sequence[str] = (),
+) -> Histogram | LabeledHistogram:
+    # Get-or-create so modules can declare the metrics they record at import time
+    if name not in REGISTRY:
+        if labelnames:
+            REGISTRY[name] = LabeledHistogram(name, documentation, labelnames, buckets)
+        else:
+            REGISTRY[name] = Histogram(name, documentation, buckets)
+    return REGISTRY[name]
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str]) -> LabeledCounter:
+    if name not in REGISTRY:
+        REGISTRY[name] = LabeledCounter(name, documentation, labelnames)
+    return REGISTRY[name]
+
+
+def register_stats(prefix: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    STATS_PROVIDERS[prefix] = provider
+
+
+# --- per-request timing -------------------------------------------------------
+
+class RequestTimings:
+    __slots__ = ("phases", "sql_count")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.sql_count = 0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> tuple[RequestTimings, Any]:
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token: Any) -> None:
+    _request_timings.reset(token)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+def record_sql(seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add("sql", seconds)
+        timings.sql_count += 1
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    # Attributes the block's wall time to `phase` of the current request, if any
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
+
+
+# --- Prometheus text exposition ----------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_le(upper: float) -> str:
+    return "+Inf" if math.isinf(upper) else repr(upper)
+
+
+def _labels(labelnames: Sequence[str], values: tuple) -> str:
+    return ",".join(f'{k}="{_escape(str(v))}"' for k, v in zip(labelnames, values))
+
+
+def _render_histogram(lines: list[str], name: str, labels: str, snapshot: Dict[str, Any]) -> None:
+    prefix = f"{labels}," if labels else ""
+    for upper, count in snapshot["buckets"]:
+        lines.append(f'{name}_bucket{{{prefix}le="{_format_le(upper)}"}} {count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for name, metric in list(REGISTRY.items()):
+        lines.append(f"# HELP {name} {metric.documentation}")
+        if isinstance(metric, LabeledCounter):
+            lines.append(f"# TYPE {name} counter")
+            for values, count in metric.children():
+                lines.append(f"{name}{{{_labels(metric.labelnames, values)}}} {count}")
+            continue
+        lines.append(f"# TYPE {name} histogram")
+        if isinstance(metric, LabeledHistogram):
+            for values, child in metric.children():
+                _render_histogram(lines, name, _labels(metric.labelnames, values), child.snapshot())
+        else:
+            _render_histogram(lines, name, "", metric.snapshot())
+
+    for prefix, provider in list(STATS_PROVIDERS.items()):
+        for key, value in provider().items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{prefix}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,80 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import end_request_timings, histogram, start_request_timings
+
+request_duration = histogram(
+    "http_request_duration_seconds",
+    "Total time to handle a request",
+    labelnames=("route", "method", "status"),
+)
+request_phase_duration = histogram(
+    "http_request_phase_seconds",
+    "Time spent per request in bcrypt, jwt and sql",
+    labelnames=("route", "phase"),
+)
+request_sql_statements = histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request",
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50),
+    labelnames=("route",),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestMetricsMiddleware:
+    """Records per-route latency, phase timings and SQL counts.
+
+    Plain ASGI rather than BaseHTTPMiddleware so the cost per request is a
+    couple of perf_counter calls and a few histogram observations.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request_timings()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    total = time.perf_counter() - started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(timings, total).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            end_request_timings(token)
+            # Route templates keep label cardinality bounded (no raw paths)
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            request_duration.labels(route_path, scope["method"], str(status_code)).observe(elapsed)
+            for phase, seconds in timings.phases.items():
+                request_phase_duration.labels(route_path, phase).observe(seconds)
+            request_sql_statements.labels(route_path).observe(timings.sql_count)
+
+
+def _server_timing(timings, total: float) -> str:
+    parts = []
+    for phase, seconds in timings.phases.items():
+        entry = f"{phase};dur={seconds * 1000:.2f}"
+        if phase == "sql":
+            entry += f';desc="{timings.sql_count} queries"'
+        parts.append(entry)
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.exceptions import TooManyRequests
+
+
+def _slide(window_start: float, previous: int, current: int, now: float, window: float):
+    """Advance a two-bucket window to `now`; returns (window_start, previous, current, estimate).
+
+    The estimate weights the previous fixed window by how much of it still
+    overlaps the sliding window, which approximates a true sliding log with
+    two integers per key.
+    """
+    elapsed_windows = int((now - window_start) // window)
+    if elapsed_windows == 1:
+        window_start, previous, current = window_start + window, current, 0
+    elif elapsed_windows > 1:
+        window_start, previous, current = now - (now - window_start) % window, 0, 0
+    overlap = 1 - (now - window_start) / window
+    return window_start, previous, current, previous * overlap + current
+
+
+def _retry_after(window_start: float, previous: int, current: int, now: float, window: float, limit: int) -> float:
+    """Seconds until `estimate + 1 <= limit` holds again, if no other hit is admitted meanwhile."""
+    window_end = window_start + window
+    if current + 1 <= limit and previous:
+        # Still in this window, once enough of the previous bucket has slid out
+        admitted_at = window_start + window * (1 - (limit - current - 1) / previous)
+        if admitted_at < window_end:
+            return max(admitted_at - now, 0.0)
+    # In the next window this window's hits are the previous bucket, decaying from full weight
+    if current == 0:
+        return max(window_end - now, 0.0)
+    decay = max(1 - (limit - 1) / current, 0.0)
+    return max(window_end + window * decay - now, 0.0)
+
+
+class MemoryRateLimitStore:
+    """Per-process sliding-window counters with LRU eviction of idle keys."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._data: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> tuple[bool, float]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                entry = [now, 0, 0]
+                self._data[key] = entry
+                while len(self._data) > self.max_keys:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._data.move_to_end(key)
+            start, previous, current, estimate = _slide(*entry, now, window)
+            entry[:] = [start, previous, current]
+            if estimate + 1 > limit:
+                return False, _retry_after(start, previous, current, now, window, limit)
+            entry[2] += 1
+            return True, 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._data), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+class SQLiteRateLimitStore:
+    """Sliding-window counters in a local SQLite file shared by every worker.
+
+    Each hit is one short IMMEDIATE transaction, which serialises workers on
+    the file lock. Idle keys are swept every `sweep_every` hits.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, sweep_every: int = 1000):
+        self.path = path
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._hits = 0
+        self.swept = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_start REAL NOT NULL, "
+                "previous INTEGER NOT NULL, current INTEGER NOT NULL, touched REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> tuple[bool, float]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, previous, current FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            start, previous, current, estimate = _slide(*(row or (now, 0, 0)), now, window)
+            allowed = estimate + 1 <= limit
+            if allowed:
+                current += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window_start, previous, current, touched) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, start, previous, current, now),
+            )
+            self._hits += 1
+            if self._hits % self.sweep_every == 0:
+                # Anything untouched for two windows would slide to zero anyway
+                self.swept += conn.execute(
+                    "DELETE FROM rate_limits WHERE touched < ?", (now - 2 * window,)
+                ).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if allowed:
+            return True, 0.0
+        return False, _retry_after(start, previous, current, now, window, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"swept": self.swept}
+
+
+class LoginRateLimiter:
+    """Throttles login attempts per client IP and per email address.
+
+    Every attempt counts, successful or not, and is checked before the user
+    lookup and bcrypt so a flood of guesses costs one counter update each.
+    """
+
+    def __init__(self, store, *, per_ip: int, per_email: int, window_seconds: float):
+        self.store = store
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.window_seconds = window_seconds
+
+        self.allowed = 0
+        self.rejected_ip = 0
+        self.rejected_email = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None and self.window_seconds > 0
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        # Fixed-size key; the shared store never holds the address itself
+        return "email:" + hashlib.blake2b(email.strip().lower().encode(), digest_size=16).hexdigest()
+
+    def _hit(self, key: str, limit: int) -> tuple[bool, float]:
+        return self.store.hit(key, limit, self.window_seconds, time.time())
+
+    def _check(self, ip_address: str | None, email: str) -> None:
+        if ip_address and self.per_ip > 0:
+            allowed, retry_after = self._hit(f"ip:{ip_address}", self.per_ip)
+            if not allowed:
+                self.rejected_ip += 1
+                raise TooManyRequests(retry_after=max(math.ceil(retry_after), 1))
+        if self.per_email > 0:
+            allowed, retry_after = self._hit(self._email_key(email), self.per_email)
+            if not allowed:
+                self.rejected_email += 1
+                raise TooManyRequests(retry_after=max(math.ceil(retry_after), 1))
+        self.allowed += 1
+
+    async def check(self, ip_address: str | None, email: str) -> None:
+        """Record one attempt; raises TooManyRequests when either limit is exceeded."""
+        if not self.enabled:
+            return
+        if self.store.blocking:
+            await asyncio.to_thread(self._check, ip_address, email)
+        else:
+            self._check(ip_address, email)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "rejected_ip": self.rejected_ip,
+            "rejected_email": self.rejected_email,
+            **(self.store.stats() if self.store is not None else {}),
+        }
+
+
+class CallerRateLimiter:
+    """Throttles calls per caller key (an API key or a client IP)."""
+
+    def __init__(self, store, *, prefix: str, limit: int, window_seconds: float):
+        self.store = store
+        self.prefix = prefix
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+        self.allowed = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None and self.limit > 0 and self.window_seconds > 0
+
+    def _check(self, caller: str) -> None:
+        key = f"{self.prefix}:" + hashlib.blake2b(caller.encode(), digest_size=16).hexdigest()
+        allowed, retry_after = self.store.hit(key, self.limit, self.window_seconds, time.time())
+        if not allowed:
+            self.rejected += 1
+            raise TooManyRequests(retry_after=max(math.ceil(retry_after), 1))
+        self.allowed += 1
+
+    async def check(self, caller: str) -> None:
+        """Record one call; raises TooManyRequests when the caller is over its limit."""
+        if not self.enabled:
+            return
+        if self.store.blocking:
+            await asyncio.to_thread(self._check, caller)
+        else:
+            self._check(caller)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "allowed": self.allowed, "rejected": self.rejected}
+
+
+def _build_store():
+    backend = settings.LOGIN_RATE_LIMIT_BACKEND.lower()
+    if backend == "off":
+        return None
+    if backend == "sqlite":
+        return SQLiteRateLimitStore(settings.LOGIN_RATE_LIMIT_SQLITE_PATH)
+    return MemoryRateLimitStore(settings.LOGIN_RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = _build_store()
+
+login_rate_limiter = LoginRateLimiter(
+    rate_limit_store,
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+    per_email=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+introspect_rate_limiter = CallerRateLimiter(
+    rate_limit_store,
+    prefix="introspect",
+    limit=settings.INTROSPECT_RATE_LIMIT_PER_CALLER,
+    window_seconds=settings.INTROSPECT_RATE_LIMIT_WINDOW_SECONDS,
+)
@@ -1,15 +1,123 @@
-from typing import Any, Optional
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+
+from app.core.config import settings
+from app.core.metrics import counter
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional speedup
+    msgspec = None
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    # orjson handles datetimes and UUIDs itself but not Decimal
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _select_backend(name: str) -> tuple[str, Callable[[Any], bytes]]:
+    # "auto" picks the fastest encoder that is installed
+    if name in ("auto", "orjson") and orjson is not None:
+        return "orjson", _orjson_dumps
+    if name in ("auto", "msgspec") and msgspec is not None:
+        return "msgspec", msgspec.json.Encoder(decimal_format="string").encode
+    return "json", _stdlib_dumps
+
+
+JSON_BACKEND, json_dumps = _select_backend(settings.JSON_RESPONSE_BACKEND)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes datetimes, UUIDs and Decimals (as strings) with every backend."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
 
 def success_response(message: str, data: Optional[Any] = None, status_code: int = status.HTTP_200_OK):
     payload = {"status": True, "message": message}
     if data is not None:
         payload["data"] = data
-    return JSONResponse(status_code=status_code, content=payload)
+    return FastJSONResponse(status_code=status_code, content=payload)
+
+
+error_counter = counter("app_errors_total", "Error responses by error code", ("code",))
+
+# Bodies of the errors that bad clients and attack traffic trigger most, encoded up front
+COMMON_ERRORS = (
+    ("Invalid token", "INVALID_TOKEN"),
+    ("Invalid token type", "INVALID_TOKEN"),
+    ("Invalid token payload", "INVALID_TOKEN"),
+    ("Invalid refresh token", "INVALID_TOKEN"),
+    ("Token has expired", "TOKEN_EXPIRED"),
+    ("Refresh token has expired", "TOKEN_EXPIRED"),
+    ("Token has been revoked", "TOKEN_REVOKED"),
+    ("No active session found", "NO_ACTIVE_SESSION"),
+    ("Invalid credentials", "INVALID_CREDENTIALS"),
+    ("Missing or invalid Authorization header", "AUTH_HEADER_MISSING"),
+    ("Not authenticated", "HTTP_ERROR"),
+    ("Validation error", "VALIDATION_ERROR"),
+    ("Too many attempts, please retry later", "TOO_MANY_REQUESTS"),
+    ("Server is busy, please retry", "SERVER_BUSY"),
+    ("Database error occurred", "DATABASE_ERROR"),
+    ("An unexpected error occurred", "INTERNAL_SERVER_ERROR"),
+)
+# Other messages are cached as they occur, up to this many
+ERROR_BODY_CACHE_SIZE = 256
+
+_error_bodies: Dict[tuple[str, str], bytes] = {}
+
+
+def _error_body(error: str, code: str) -> bytes:
+    body = _error_bodies.get((error, code))
+    if body is None:
+        body = json_dumps({"status": False, "error": error, "code": code})
+        if len(_error_bodies) < ERROR_BODY_CACHE_SIZE:
+            _error_bodies[(error, code)] = body
+    return body
+
+
+for _error, _code in COMMON_ERRORS:
+    _error_body(_error, _code)
+
 
-def error_response(error: str, code: str, status_code: int = status.HTTP_400_BAD_REQUEST, details: Optional[Any] = None):
+def error_response(
+    error: str,
+    code: str,
+    status_code: int = status.HTTP_400_BAD_REQUEST,
+    details: Optional[Any] = None,
+    headers: Optional[Dict[str, str]] = None,
+):
+    error_counter.inc(code)
+    if details is None and isinstance(error, str):
+        # Detail-free errors are the same few bodies over and over; skip the encoder
+        return Response(_error_body(error, code), status_code, headers, media_type="application/json")
     payload = {"status": False, "error": error, "code": code}
     if details is not None:
         payload["details"] = details
-    return JSONResponse(status_code=status_code, content=payload)
+    return FastJSONResponse(status_code=status_code, content=payload, headers=headers)
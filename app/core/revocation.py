@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+
+class RevocationList:
+    """In-memory revocation set checked on every access-token validation.
+
+    Two kinds of entries, each kept only until the tokens it covers expire:
+    a `jti` revokes one token (a session's `sid` is matched the same way and
+    revokes every token of that session), a per-user epoch revokes every
+    token of that user issued before it. Entries are appended to a small line-oriented
+    log file (`u <user_id> <epoch> <expires>` / `j <jti> <expires>`) which
+    is replayed on start-up and tailed every `sync_interval` seconds, so
+    revocations made by other workers are picked up too.
+    """
+
+    def __init__(self, *, enabled: bool, path: str, token_ttl: float, sync_interval: float, compact_bytes: int):
+        self.enabled = enabled
+        self.path = path
+        self.token_ttl = token_ttl
+        self.sync_interval = sync_interval
+        self.compact_bytes = compact_bytes
+        self._compact_at = compact_bytes
+
+        self._jtis: Dict[str, float] = {}
+        self._users: Dict[int, tuple[float, float]] = {}
+        self._offset = 0
+        self._inode: int | None = None
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+        self.revoked_checks = 0
+        self.compactions = 0
+
+    # --- queries ---------------------------------------------------------
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        if not self.enabled:
+            return False
+        self.maybe_sync()
+        for key in ("jti", "sid"):
+            token_id = payload.get(key)
+            if token_id is not None and token_id in self._jtis:
+                self.revoked_checks += 1
+                return True
+        entry = self._users.get(int(payload["sub"]))
+        if entry is not None and float(payload.get("iat", 0)) < entry[0]:
+            self.revoked_checks += 1
+            return True
+        return False
+
+    # --- updates ---------------------------------------------------------
+
+    def revoke_jti(self, jti: str, expires_at: float) -> None:
+        if not self.enabled:
+            return
+        self._apply_jti(jti, expires_at)
+        self._append(f"j {jti} {expires_at:.3f}\n")
+
+    def revoke_user(self, user_id: int, epoch: float | None = None) -> None:
+        # Every token for this user issued before `epoch` stops validating
+        if not self.enabled:
+            return
+        epoch = time.time() if epoch is None else epoch
+        expires_at = epoch + self.token_ttl
+        self._apply_user(user_id, epoch, expires_at)
+        self._append(f"u {user_id} {epoch:.6f} {expires_at:.3f}\n")
+
+    def _apply_jti(self, jti: str, expires_at: float) -> None:
+        if expires_at > self._jtis.get(jti, 0.0):
+            self._jtis[jti] = expires_at
+
+    def _apply_user(self, user_id: int, epoch: float, expires_at: float) -> None:
+        current = self._users.get(user_id)
+        if current is None or epoch > current[0]:
+            self._users[user_id] = (epoch, expires_at)
+
+    # --- persistence -----------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append(self, line: str) -> None:
+        with self._file_lock(), open(self.path, "a", encoding="ascii") as fh:
+            fh.write(line)
+
+    def _replay(self, lines: list[str]) -> None:
+        for line in lines:
+            parts = line.split()
+            try:
+                if parts[0] == "u" and len(parts) == 4:
+                    self._apply_user(int(parts[1]), float(parts[2]), float(parts[3]))
+                elif parts[0] == "j" and len(parts) == 3:
+                    self._apply_jti(parts[1], float(parts[2]))
+            except (IndexError, ValueError):
+                continue  # torn or foreign line; ignore
+
+    def sync(self) -> None:
+        """Read entries appended since the last sync (by any worker).
+
+        Compacts the log once it has grown past `compact_bytes`, so a
+        long-running process doesn't leave an ever-growing file to replay.
+        """
+        size = self._read_new()
+        if size > self._compact_at:
+            self.compact()
+
+    def _read_new(self) -> int:
+        # Returns the current file size (0 if there is no file yet)
+        with self._lock:
+            self._last_sync = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return 0
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                # File was compacted by some worker: replay it from the start
+                self._inode, self._offset = stat.st_ino, 0
+            if stat.st_size == self._offset:
+                self.purge()
+                return stat.st_size
+            with open(self.path, "r", encoding="ascii") as fh:
+                fh.seek(self._offset)
+                chunk = fh.read()
+            # Only consume complete lines; a partial write is picked up next time
+            complete, _, _ = chunk.rpartition("\n")
+            if complete:
+                self._replay(complete.splitlines())
+                self._offset += len(complete) + 1
+            self.purge()
+            return stat.st_size
+
+    def maybe_sync(self) -> None:
+        if self.enabled and time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def purge(self) -> None:
+        now = time.time()
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._users = {uid: entry for uid, entry in self._users.items() if entry[1] > now}
+
+    def load(self) -> None:
+        """Replay the log on start-up (compacting it if it has grown large)."""
+        if not self.enabled:
+            return
+        self.sync()
+
+    def compact(self) -> None:
+        # Rewrite the log with live entries only; readers notice the new inode
+        with self._file_lock():
+            self._offset, self._inode = 0, None
+            if self._read_new() <= self._compact_at:
+                return  # another worker compacted it while we waited for the lock
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="ascii") as fh:
+                for user_id, (epoch, expires_at) in self._users.items():
+                    fh.write(f"u {user_id} {epoch:.6f} {expires_at:.3f}\n")
+                for jti, expires_at in self._jtis.items():
+                    fh.write(f"j {jti} {expires_at:.3f}\n")
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self._inode, self._offset = stat.st_ino, stat.st_size
+            # Live entries alone may exceed compact_bytes; don't rewrite on every sync then
+            self._compact_at = max(self.compact_bytes, 2 * stat.st_size)
+            self.compactions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._users),
+            "revoked_checks": self.revoked_checks,
+            "compactions": self.compactions,
+        }
+
+
+revocation_list = RevocationList(
+    enabled=settings.REVOCATION_LIST_ENABLED,
+    path=settings.REVOCATION_LIST_PATH,
+    token_ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    sync_interval=settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+    compact_bytes=settings.REVOCATION_LIST_COMPACT_BYTES,
+)
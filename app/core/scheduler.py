@@ -0,0 +1,49 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs an async job every `interval` seconds on the app's event loop.
+
+    A small random jitter spreads the runs of several workers apart.
+    Failures are logged and the next run still happens.
+    """
+
+    def __init__(self, name: str, interval: float, job: Callable[[], Awaitable[object]], jitter: float = 0.1):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.jitter = jitter
+        self._task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval * (1 + random.uniform(0, self.jitter)))
+            try:
+                await self.job()
+                self.runs += 1
+            except Exception:
+                self.failures += 1
+                logger.exception("periodic task %s failed", self.name)
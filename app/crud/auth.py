@@ -1,7 +1,18 @@
+from typing import Iterable
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.exceptions import AppException, EmailExists, UsernameExists
 from app.models.user import User
-from app.utils.security import hash_password
+
+# Substrings identifying each unique index in SQLite/PostgreSQL/MySQL error messages
+UNIQUE_CONSTRAINT_MARKERS = {
+    "email": ("users.email", "ix_users_email", "users_email_key"),
+    "username": ("users.username", "ix_users_username", "users_username_key"),
+}
 
 
 def create_user(
@@ -10,7 +21,7 @@ def create_user(
     username: str,
     email: str,
     phone_number: str,
-    password: str,
+    password_hash: str,
     ip_address: str,
     login_method: str,
 ):
@@ -18,7 +29,7 @@ def create_user(
         username=username,
         email=email,
         phone_number=phone_number,
-        password_hash=hash_password(password),
+        password_hash=password_hash,
         ip_address=ip_address,
         login_method=login_method,
     )
@@ -38,3 +49,99 @@ def get_user_by_username(db: Session, username: str):
 
 def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.user_id == user_id).first()
+
+
+def _violated_unique_field(exc: IntegrityError) -> str | None:
+    message = str(exc.orig).lower()
+    for field, markers in UNIQUE_CONSTRAINT_MARKERS.items():
+        if any(marker in message for marker in markers):
+            return field
+    return None
+
+
+async def _duplicate_user_error_async(
+    db: AsyncSession, exc: IntegrityError, *, email: str, username: str
+) -> AppException | IntegrityError:
+    # Email wins when both collide, so only an email violation is conclusive on its own
+    if _violated_unique_field(exc) == "email":
+        return EmailExists()
+    result = await db.execute(
+        select(User.email, User.username)
+        .where(or_(User.email == email, User.username == username))
+        .limit(2)
+    )
+    rows = result.all()
+    if any(row.email == email for row in rows):
+        return EmailExists()
+    if any(row.username == username for row in rows):
+        return UsernameExists()
+    return exc
+
+
+async def create_user_async(
+    db: AsyncSession,
+    *,
+    username: str,
+    email: str,
+    phone_number: str,
+    password_hash: str,
+    ip_address: str,
+    login_method: str,
+):
+    # Insert first and let the unique indexes catch duplicates: one round trip on success
+    stmt = (
+        insert(User)
+        .values(
+            username=username,
+            email=email,
+            phone_number=phone_number,
+            password_hash=password_hash,
+            ip_address=ip_address,
+            login_method=login_method,
+        )
+        .returning(User.user_id, User.username, User.email)
+    )
+    try:
+        user = (await db.execute(stmt)).one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise await _duplicate_user_error_async(db, exc, email=email, username=username)
+    return user
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+
+async def get_user_by_username_async(db: AsyncSession, username: str):
+    result = await db.execute(select(User).where(User.username == username).limit(1))
+    return result.scalars().first()
+
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+
+async def get_users_by_ids_async(db: AsyncSession, user_ids: Iterable[int]):
+    # Column-only rows for batch lookups (token introspection), one IN query
+    result = await db.execute(
+        select(User.user_id, User.username, User.email, User.active_session_count)
+        .where(User.user_id.in_(set(user_ids)))
+    )
+    return result.all()
+
+
+async def update_password_hash_async(
+    db: AsyncSession, user_id: int, *, old_hash: str, new_hash: str
+) -> bool:
+    # Compare-and-set on the old hash so a concurrent password change always wins
+    result = await db.execute(
+        update(User)
+        .where(User.user_id == user_id, User.password_hash == old_hash)
+        .values(password_hash=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
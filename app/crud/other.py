@@ -1,7 +1,57 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_, update
+from datetime import datetime
+import time
+from typing import Iterable
 
+from app.core.cache import principal_cache
+from app.core.revocation import revocation_list
+from app.crud.refresh_token import new_refresh_token, revoke_user_refresh_tokens_statement
+from app.models.refresh_token import RefreshToken
+from app.db.write_behind import login_record_writer
 from app.models.login_record import LoginRecord
+from app.models.user import User
+
+
+def _count_login_statement(user_id: int, is_active: bool):
+    # Keeps User.active_session_count/last_login_at in the login record's transaction
+    return (
+        update(User)
+        .where(User.user_id == user_id)
+        .values(active_session_count=User.active_session_count + int(is_active), last_login_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _recount_sessions_statement(*criteria):
+    # Recomputes the counters from login_records with correlated aggregates
+    active_count = (
+        select(func.count(LoginRecord.id))
+        .where(LoginRecord.user_id == User.user_id, LoginRecord.is_active == True)
+        .scalar_subquery()
+    )
+    last_login = (
+        select(func.max(LoginRecord.created_at))
+        .where(LoginRecord.user_id == User.user_id)
+        .scalar_subquery()
+    )
+    return (
+        update(User)
+        .where(*criteria)
+        # Retention may have archived every record, so keep the stored value then
+        .values(active_session_count=active_count, last_login_at=func.coalesce(last_login, User.last_login_at))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _status_change_statement(user_id: int, delta: int):
+    return (
+        update(User)
+        .where(User.user_id == user_id)
+        .values(active_session_count=User.active_session_count + delta)
+        .execution_options(synchronize_session=False)
+    )
 
 
 def create_login_record(
@@ -13,6 +63,8 @@ def create_login_record(
     login_method: str,
     ip_address: str | None,
     is_active: bool,
+    family_id: str | None = None,
+    access_jti: str | None = None,
 ):
     record = LoginRecord(
         user_id=user_id,
@@ -21,10 +73,14 @@ def create_login_record(
         login_method=login_method,
         ip_address=ip_address,
         is_active=is_active,
+        family_id=family_id,
+        access_jti=access_jti,
     )
     db.add(record)
+    db.execute(_count_login_statement(user_id, is_active))
     db.commit()
     db.refresh(record)
+    principal_cache.invalidate(user_id)
     return record
 
 
@@ -35,39 +91,330 @@ def get_active_login_record(db: Session, user_id: int):
     ).order_by(LoginRecord.created_at.desc()).first()
 
 
-def logout_user(db: Session, user_id: int):
-    # Mark all active sessions for this user as logged out
-    active_records = db.query(LoginRecord).filter(
-        LoginRecord.user_id == user_id,
-        LoginRecord.is_active == True
-    ).all()
-    
-    for record in active_records:
-        record.is_active = False
-        record.logged_out_at = func.now()
-    
+def _logout_statement(*criteria):
+    # Set-based close of active sessions; rows already loaded in the session are synced by PK
+    return (
+        update(LoginRecord)
+        .where(*criteria, LoginRecord.is_active == True)
+        .values(is_active=False, logged_out_at=func.now())
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def _chunked(user_ids: Iterable[int], chunk_size: int):
+    unique_ids = list(dict.fromkeys(user_ids))
+    for start in range(0, len(unique_ids), chunk_size):
+        yield unique_ids[start:start + chunk_size]
+
+
+def logout_user(db: Session, user_id: int) -> tuple[int, list[int]]:
+    # Mark all active sessions for this user as logged out in one UPDATE ... RETURNING
+    closed_ids = list(
+        db.execute(_logout_statement(LoginRecord.user_id == user_id).returning(LoginRecord.id)).scalars()
+    )
+    db.execute(revoke_user_refresh_tokens_statement(RefreshToken.user_id == user_id))
+    db.execute(_status_change_statement(user_id, -len(closed_ids)))
     db.commit()
-    return len(active_records)  # Return number of sessions closed
+    principal_cache.invalidate(user_id)
+    revocation_list.revoke_user(user_id)
+    return len(closed_ids), closed_ids  # Number of sessions closed and their ids
+
+
+def logout_users(db: Session, user_ids: Iterable[int], *, chunk_size: int = 500) -> int:
+    # Mass revocation: one UPDATE and one commit per chunk keeps each lock window short
+    total = 0
+    for chunk in _chunked(user_ids, chunk_size):
+        result = db.execute(_logout_statement(LoginRecord.user_id.in_(chunk)))
+        db.execute(revoke_user_refresh_tokens_statement(RefreshToken.user_id.in_(chunk)))
+        db.execute(_recount_sessions_statement(User.user_id.in_(chunk)))
+        db.commit()
+        total += result.rowcount
+        for user_id in chunk:
+            principal_cache.invalidate(user_id)
+            revocation_list.revoke_user(user_id)
+    return total
 
 
-def get_login_record_by_id(db: Session, *, id: str) -> LoginRecord | None:
+def get_login_record_by_id(db: Session, *, id: int) -> LoginRecord | None:
     return db.query(LoginRecord).filter(LoginRecord.id == id).first()
 
 
+def _set_status_statement(id: int, is_active: bool, user_id: int | None):
+    # Conditional on the current state: of two concurrent changes only one gets
+    # a row back, so the session counter moves exactly once
+    criteria = [LoginRecord.id == id, LoginRecord.is_active != is_active]
+    if user_id is not None:
+        criteria.append(LoginRecord.user_id == user_id)
+    return (
+        update(LoginRecord)
+        .where(*criteria)
+        .values(is_active=is_active, logged_out_at=None if is_active else func.now())
+        .returning(LoginRecord.user_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _login_record_statement(id: int, user_id: int | None):
+    stmt = select(LoginRecord).where(LoginRecord.id == id)
+    if user_id is not None:
+        stmt = stmt.where(LoginRecord.user_id == user_id)
+    return stmt.execution_options(populate_existing=True)
+
+
 def set_login_record_status(
     db: Session,
     *,
-    id: str,
+    id: int,
     is_active: bool,
     ip_address: str | None = None,
+    user_id: int | None = None,
 ) -> LoginRecord | None:
-    record = get_login_record_by_id(db, id=id)
-    if not record:
+    changed = db.execute(_set_status_statement(id, is_active, user_id)).first()
+    if changed is not None:
+        db.execute(_status_change_statement(changed.user_id, 1 if is_active else -1))
+    record = db.execute(_login_record_statement(id, user_id)).scalars().first()
+    if record is None:
+        db.rollback()
         return None
-    record.is_active = is_active
     if ip_address is not None:
         record.ip_address = ip_address
-    db.add(record)
     db.commit()
     db.refresh(record)
+    principal_cache.invalidate(record.user_id)
     return record
+
+
+async def create_login_record_async(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    username: str,
+    email: str,
+    login_method: str,
+    ip_address: str | None,
+    is_active: bool,
+    family_id: str | None = None,
+    access_jti: str | None = None,
+    refresh_jti: str | None = None,
+):
+    """Record a login, and store its first refresh token in the same write.
+
+    With write-behind on, both go into the writer's next batch: the access
+    token works straight away, the refresh token once the batch is flushed.
+    """
+    if login_record_writer.running:
+        # Write-behind: queued for a batched insert, visible via the overlay meanwhile
+        record = await login_record_writer.enqueue(
+            user_id=user_id,
+            username=username,
+            email=email,
+            login_method=login_method,
+            ip_address=ip_address,
+            is_active=is_active,
+            family_id=family_id,
+            access_jti=access_jti,
+            refresh_jti=refresh_jti,
+        )
+        principal_cache.invalidate(user_id)
+        return record
+
+    record = LoginRecord(
+        user_id=user_id,
+        username=username,
+        email=email,
+        login_method=login_method,
+        ip_address=ip_address,
+        is_active=is_active,
+        family_id=family_id,
+        access_jti=access_jti,
+    )
+    db.add(record)
+    if refresh_jti is not None:
+        db.add(new_refresh_token(jti=refresh_jti, user_id=user_id, family_id=family_id))
+    await db.execute(_count_login_statement(user_id, is_active))
+    await db.commit()
+    await db.refresh(record)
+    principal_cache.invalidate(user_id)
+    return record
+
+
+async def get_active_login_record_async(db: AsyncSession, user_id: int):
+    pending = login_record_writer.get_active(user_id)
+    if pending:
+        return pending[0]
+    result = await db.execute(
+        select(LoginRecord)
+        .where(LoginRecord.user_id == user_id, LoginRecord.is_active == True)
+        .order_by(LoginRecord.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+def get_session_summary(user: User) -> tuple[int, datetime | None]:
+    """Active session count and last login time from the denormalized User columns.
+
+    Unflushed write-behind records are not in the counters yet, so they are added on top.
+    """
+    pending = login_record_writer.get_active(user.user_id)
+    last_login = pending[0].created_at if pending else user.last_login_at
+    return user.active_session_count + len(pending), last_login
+
+
+def has_active_session(user_id: int, active_session_count: int) -> bool:
+    # Counter from the user row plus anything still queued in the write-behind writer
+    return active_session_count > 0 or bool(login_record_writer.get_active(user_id))
+
+
+def reconcile_session_counters(db: Session, *, chunk_size: int = 5000) -> int:
+    # Repairs counter drift in user_id ranges, one aggregate UPDATE and commit per range
+    max_user_id = db.execute(select(func.max(User.user_id))).scalar() or 0
+    updated = 0
+    for start in range(0, max_user_id, chunk_size):
+        result = db.execute(
+            _recount_sessions_statement(User.user_id > start, User.user_id <= start + chunk_size)
+        )
+        db.commit()
+        updated += result.rowcount
+    return updated
+
+
+async def logout_user_async(db: AsyncSession, user_id: int) -> tuple[int, list[int]]:
+    pending_closed = await login_record_writer.close_user(user_id)
+    # Mark all active sessions for this user as logged out in one UPDATE ... RETURNING
+    result = await db.execute(
+        _logout_statement(LoginRecord.user_id == user_id).returning(LoginRecord.id)
+    )
+    closed_ids = list(result.scalars())
+    await db.execute(revoke_user_refresh_tokens_statement(RefreshToken.user_id == user_id))
+    await db.execute(_status_change_statement(user_id, -len(closed_ids)))
+    await db.commit()
+    principal_cache.invalidate(user_id)
+    revocation_list.revoke_user(user_id)
+    return len(closed_ids) + pending_closed, closed_ids  # Number of sessions closed and their ids
+
+
+async def logout_users_async(db: AsyncSession, user_ids: Iterable[int], *, chunk_size: int = 500) -> int:
+    total = 0
+    for chunk in _chunked(user_ids, chunk_size):
+        result = await db.execute(_logout_statement(LoginRecord.user_id.in_(chunk)))
+        await db.execute(revoke_user_refresh_tokens_statement(RefreshToken.user_id.in_(chunk)))
+        await db.execute(_recount_sessions_statement(User.user_id.in_(chunk)))
+        await db.commit()
+        total += result.rowcount
+        for user_id in chunk:
+            principal_cache.invalidate(user_id)
+            revocation_list.revoke_user(user_id)
+    return total
+
+
+async def get_login_record_by_id_async(db: AsyncSession, *, id: int) -> LoginRecord | None:
+    return await db.get(LoginRecord, id)
+
+
+SESSION_COLUMNS = (
+    LoginRecord.id,
+    LoginRecord.login_method,
+    LoginRecord.ip_address,
+    LoginRecord.is_active,
+    LoginRecord.created_at,
+    LoginRecord.logged_out_at,
+)
+
+
+async def list_login_records_async(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+    is_active: bool | None = None,
+):
+    """One page of a user's login records, newest first, as column-only rows.
+
+    Keyset pagination over (created_at, id): `after` is the last row of the
+    previous page. The anchor's created_at is re-read from the table so the
+    comparison is against the stored value, with the cursor's own value as
+    a fallback once retention has deleted the anchor row.
+    """
+    stmt = select(*SESSION_COLUMNS).where(LoginRecord.user_id == user_id)
+    if is_active is not None:
+        stmt = stmt.where(LoginRecord.is_active == is_active)
+    if after is not None:
+        after_created_at, after_id = after
+        anchor = (
+            select(LoginRecord.created_at)
+            .where(LoginRecord.id == after_id, LoginRecord.user_id == user_id)
+            .scalar_subquery()
+        )
+        stmt = stmt.where(
+            tuple_(LoginRecord.created_at, LoginRecord.id)
+            < tuple_(func.coalesce(anchor, after_created_at), after_id)
+        )
+    stmt = stmt.order_by(LoginRecord.created_at.desc(), LoginRecord.id.desc()).limit(limit)
+    return (await db.execute(stmt)).all()
+
+
+async def set_login_record_status_async(
+    db: AsyncSession,
+    *,
+    id: int,
+    is_active: bool,
+    ip_address: str | None = None,
+    user_id: int | None = None,
+) -> LoginRecord | None:
+    changed = (await db.execute(_set_status_statement(id, is_active, user_id))).first()
+    if changed is not None:
+        await db.execute(_status_change_statement(changed.user_id, 1 if is_active else -1))
+    record = (await db.execute(_login_record_statement(id, user_id))).scalars().first()
+    if record is None:
+        await db.rollback()
+        return None
+    if ip_address is not None:
+        record.ip_address = ip_address
+    await db.commit()
+    await db.refresh(record)
+    principal_cache.invalidate(record.user_id)
+    return record
+
+
+async def revoke_login_record_async(db: AsyncSession, *, id: int, user_id: int) -> LoginRecord | None:
+    """End one session: close its record, revoke its refresh-token family and its access tokens.
+
+    Access tokens are revoked by the session's `sid` claim, which covers the
+    ones issued by later refreshes, and by the login's own jti for tokens
+    issued before sessions carried a `sid`.
+    """
+    record = await set_login_record_status_async(db, id=id, is_active=False, user_id=user_id)
+    if record is None:
+        return None
+    family_id, access_jti = record.family_id, record.access_jti
+    if family_id is not None:
+        await db.execute(revoke_user_refresh_tokens_statement(RefreshToken.family_id == family_id))
+        await db.commit()
+    expires_at = time.time() + revocation_list.token_ttl
+    for token_id in (family_id, access_jti):
+        if token_id is not None:
+            revocation_list.revoke_jti(token_id, expires_at)
+    return record
+
+
+async def revoke_session_async(db: AsyncSession, *, family_id: str, user_id: int) -> int:
+    """End the session a refresh-token family belongs to; returns the records closed.
+
+    Used when a refresh token is reused: the family itself is revoked by the
+    rotation, this closes the login record and revokes the access tokens
+    carrying the session's `sid`.
+    """
+    pending_closed = await login_record_writer.close_user(user_id, family_id)
+    result = await db.execute(
+        _logout_statement(LoginRecord.user_id == user_id, LoginRecord.family_id == family_id)
+        .returning(LoginRecord.id)
+    )
+    closed = len(result.all())
+    if closed:
+        await db.execute(_status_change_statement(user_id, -closed))
+    await db.commit()
+    principal_cache.invalidate(user_id)
+    revocation_list.revoke_jti(family_id, time.time() + revocation_list.token_ttl)
+    return closed + pending_closed
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import InvalidToken, RefreshTokenReused
+from app.models.refresh_token import RefreshToken
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _default_expiry() -> datetime:
+    return _utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def new_refresh_token(
+    *,
+    jti: str,
+    user_id: int,
+    family_id: str | None = None,
+    expires_at: datetime | None = None,
+) -> RefreshToken:
+    # A fresh login starts a new family named after its first token; the
+    # caller adds it to the transaction that creates the login record
+    return RefreshToken(
+        jti=jti,
+        family_id=family_id or jti,
+        user_id=user_id,
+        expires_at=expires_at or _default_expiry(),
+    )
+
+
+async def rotate_refresh_token_async(db: AsyncSession, *, jti: str, new_jti: str) -> int:
+    """Consume `jti` and store `new_jti` in its family; returns the user id.
+
+    The consume is a single conditional UPDATE, so of two concurrent
+    refreshes with the same token exactly one wins. Presenting a token
+    that was already used revokes its whole family.
+    """
+    now = _utcnow()
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now, replaced_by=new_jti)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    )
+    consumed = result.first()
+    if consumed is not None:
+        db.add(RefreshToken(
+            jti=new_jti,
+            family_id=consumed.family_id,
+            user_id=consumed.user_id,
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        await db.commit()
+        return consumed.user_id
+
+    result = await db.execute(
+        select(RefreshToken.family_id, RefreshToken.used_at).where(RefreshToken.jti == jti)
+    )
+    existing = result.first()
+    if existing is not None and existing.used_at is not None:
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == existing.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        await db.commit()
+        raise RefreshTokenReused()
+    await db.rollback()
+    raise InvalidToken("Invalid refresh token")
+
+
+def revoke_user_refresh_tokens_statement(*criteria):
+    # Used by logout in the same transaction that closes the login records
+    return (
+        update(RefreshToken)
+        .where(*criteria, RefreshToken.revoked_at.is_(None), RefreshToken.used_at.is_(None))
+        .values(revoked_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _purge_statement(batch_size: int):
+    expired = (
+        select(RefreshToken.jti)
+        .where(RefreshToken.expires_at < _utcnow())
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    return delete(RefreshToken).where(RefreshToken.jti.in_(expired))
+
+
+def purge_expired_refresh_tokens(db: Session, *, batch_size: int = 1000, max_batches: int | None = None) -> int:
+    # Short delete-and-commit batches so the purge never holds a long write lock
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        deleted = db.execute(_purge_statement(batch_size)).rowcount
+        db.commit()
+        total += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+    return total
+
+
+async def purge_expired_refresh_tokens_async(
+    db: AsyncSession, *, batch_size: int = 1000, max_batches: int | None = None
+) -> int:
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        deleted = (await db.execute(_purge_statement(batch_size))).rowcount
+        await db.commit()
+        total += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+    return total
@@ -87,14 +87,14 @@ def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.user_id == user_id).first()
 
 
-def get_login_record_by_id(db: Session, *, id: str) -> LoginRecord | None:
+def get_login_record_by_id(db: Session, *, id: int) -> LoginRecord | None:
     return db.query(LoginRecord).filter(LoginRecord.id == id).first()
 
 
 def set_login_record_status(
     db: Session,
     *,
-    id: str,
+    id: int,
     is_active: bool,
     ip_address: str | None = None,
 ) -> LoginRecord | None:
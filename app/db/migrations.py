@@ -0,0 +1,108 @@
+import logging
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# Revision that matches the oldest schema Base.metadata.create_all() produced before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def alembic_config():
+    # Imported lazily: workers only need alembic when they check the schema
+    from alembic.config import Config
+
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return config
+
+
+def head_revisions() -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def _current_revisions(connection: Connection) -> set[str]:
+    try:
+        rows = connection.execute(text("SELECT version_num FROM alembic_version"))
+    except DBAPIError:
+        # No alembic_version table: never migrated
+        connection.rollback()
+        return set()
+    return {row[0] for row in rows}
+
+
+async def check_schema_version(engine: AsyncEngine, mode: str | None = None) -> bool:
+    """Compare the database's Alembic revision with the code's head.
+
+    One SELECT, no reflection. `mode` (DB_SCHEMA_CHECK) is "warn" to log a
+    mismatch, "strict" to refuse to start, or "off" to skip the query.
+    """
+    mode = (mode or settings.DB_SCHEMA_CHECK).lower()
+    if mode == "off":
+        return True
+
+    async with engine.connect() as connection:
+        current = await connection.run_sync(_current_revisions)
+    expected = head_revisions()
+    if current == expected:
+        return True
+
+    message = (
+        f"database schema is at {sorted(current) or 'no revision'}, code expects {sorted(expected)}; "
+        "run `python prestart.py` (alembic upgrade head)"
+    )
+    if mode == "strict":
+        raise RuntimeError(message)
+    logger.warning(message)
+    return False
+
+
+def _legacy_revision(inspector) -> str:
+    """Revision matching a schema built by create_all() before migrations existed.
+
+    The startup create_all() picked up each model change as it landed, so
+    such a database can be at any revision up to 0004. Checked newest first.
+    """
+    if "active_session_count" in {column["name"] for column in inspector.get_columns("users")}:
+        return "0004"
+    if inspector.has_table("refresh_tokens"):
+        return "0003"
+    if "ix_login_records_user_active_created" in {index["name"] for index in inspector.get_indexes("login_records")}:
+        return "0002"
+    return BASELINE_REVISION
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """Bring the database to `revision`; meant to run once per deploy, not per worker.
+
+    Databases created by the old startup create_all() have tables but no
+    alembic_version, so they are first stamped at the revision their
+    schema already matches.
+    """
+    from alembic import command
+
+    config = alembic_config()
+    legacy_revision = None
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        if inspector.has_table("users") and not inspector.has_table("alembic_version"):
+            legacy_revision = _legacy_revision(inspector)
+    if legacy_revision is not None:
+        logger.info("stamping existing schema at revision %s", legacy_revision)
+        command.stamp(config, legacy_revision)
+    command.upgrade(config, revision)
+
+
+def stamp_database(revision: str = "head") -> None:
+    from alembic import command
+
+    command.stamp(alembic_config(), revision, purge=True)
@@ -0,0 +1,252 @@
+import gzip
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import user  # noqa: F401  (resolves LoginRecord.user)
+from app.models.login_record import LoginRecord
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process guard
+    fcntl = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # parquet output is optional
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Every column, so an archive can restore the rows it replaces
+ARCHIVE_COLUMNS = tuple(LoginRecord.__table__.columns)
+
+
+@dataclass
+class RetentionReport:
+    archived: int = 0
+    batches: int = 0
+    files: list[str] = field(default_factory=list)
+    resumed_from: int = 0
+    finished: bool = False
+    skipped: bool = False
+
+
+class LoginRecordRetention:
+    """Archives and deletes inactive login records older than `max_age_days`.
+
+    Works in keyset order over the primary key. The ids of each chunk are
+    saved in the checkpoint first, then the chunk is written to its own
+    compressed archive file, deleted in one short transaction, and the
+    checkpoint is advanced past its last id. A resumed run finishes that
+    same chunk before selecting a new one, so chunk boundaries never shift
+    and no row lands in two archive files. After every chunk the job
+    sleeps `pause_ratio` times as long as the chunk took, and the chunk
+    size shrinks whenever a chunk runs over `max_batch_seconds`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        max_age_days: int,
+        chunk_size: int,
+        archive_dir: str,
+        archive_format: str,
+        checkpoint_path: str,
+        max_batch_seconds: float,
+        pause_ratio: float,
+        min_chunk_size: int = 100,
+    ):
+        if archive_format == "parquet" and pyarrow is None:
+            raise RuntimeError("parquet archives need pyarrow installed")
+        self.session_factory = session_factory
+        self.max_age_days = max_age_days
+        self.chunk_size = chunk_size
+        self.archive_dir = archive_dir
+        self.archive_format = archive_format
+        self.checkpoint_path = checkpoint_path
+        self.max_batch_seconds = max_batch_seconds
+        self.pause_ratio = pause_ratio
+        self.min_chunk_size = min(min_chunk_size, chunk_size)
+
+    # --- checkpoint --------------------------------------------------------
+
+    def _load_checkpoint(self) -> Dict[str, Any] | None:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(checkpoint, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[bool]:
+        # Only one worker/CLI at a time; others skip instead of waiting
+        if fcntl is None:
+            yield True
+            return
+        with open(f"{self.checkpoint_path}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- archive files -----------------------------------------------------
+
+    def _archive_path(self, first_id: int, last_id: int) -> str:
+        extension = "parquet" if self.archive_format == "parquet" else "jsonl.gz"
+        return os.path.join(self.archive_dir, f"login_records-{first_id:012d}-{last_id:012d}.{extension}")
+
+    def _write_archive(self, rows: list[Dict[str, Any]], path: str) -> str:
+        tmp_path = f"{path}.tmp"
+        if self.archive_format == "parquet":
+            pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), tmp_path, compression="zstd")
+        else:
+            with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as fh:
+                for row in rows:
+                    fh.write(json.dumps(row, default=_json_default, separators=(",", ":")).encode("utf-8"))
+                    fh.write(b"\n")
+        with open(tmp_path, "rb") as fh:
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    # --- main loop ---------------------------------------------------------
+
+    def run(self, *, max_batches: int | None = None, max_runtime_seconds: float | None = None) -> RetentionReport:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        # The lock and checkpoint files live next to the checkpoint, wherever the archives go
+        checkpoint_dir = os.path.dirname(self.checkpoint_path)
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+        with self._exclusive() as acquired:
+            if not acquired:
+                logger.info("retention already running elsewhere; skipping")
+                return RetentionReport(skipped=True)
+            return self._run(max_batches, max_runtime_seconds)
+
+    def _run(self, max_batches: int | None, max_runtime_seconds: float | None) -> RetentionReport:
+        checkpoint = self._load_checkpoint()
+        if checkpoint is None:
+            # A new run fixes its cutoff so a resumed run archives the same set
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+            checkpoint = {"cutoff": cutoff.isoformat(), "last_id": 0}
+            self._save_checkpoint(checkpoint)
+        cutoff = datetime.fromisoformat(checkpoint["cutoff"])
+        report = RetentionReport(resumed_from=checkpoint["last_id"])
+        started = time.monotonic()
+        chunk_size = self.chunk_size
+
+        while True:
+            # Out of budget: keep the checkpoint so the next run resumes here
+            if max_batches is not None and report.batches >= max_batches:
+                return report
+            if max_runtime_seconds is not None and time.monotonic() - started > max_runtime_seconds:
+                return report
+            batch_started = time.monotonic()
+            db = self.session_factory()
+            try:
+                pending = checkpoint.get("pending")
+                if pending is None:
+                    ids = list(
+                        db.execute(
+                            select(LoginRecord.id)
+                            .where(
+                                LoginRecord.id > checkpoint["last_id"],
+                                LoginRecord.is_active == False,
+                                LoginRecord.created_at < cutoff,
+                            )
+                            .order_by(LoginRecord.id)
+                            .limit(chunk_size)
+                        ).scalars()
+                    )
+                    if not ids:
+                        break
+                    # Fix the chunk before archiving it; a resumed run finishes exactly these ids
+                    pending = {"ids": ids, "path": self._archive_path(ids[0], ids[-1])}
+                    checkpoint["pending"] = pending
+                    self._save_checkpoint(checkpoint)
+                rows = [
+                    dict(row._mapping)
+                    for row in db.execute(
+                        select(*ARCHIVE_COLUMNS)
+                        .where(LoginRecord.id.in_(pending["ids"]), LoginRecord.is_active == False)
+                        .order_by(LoginRecord.id)
+                    )
+                ]
+                # No rows left: the delete committed before the checkpoint moved on,
+                # and the archive written before it is complete
+                if rows:
+                    self._write_archive(rows, pending["path"])
+                    db.execute(
+                        delete(LoginRecord)
+                        .where(LoginRecord.id.in_([row["id"] for row in rows]))
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+            finally:
+                db.close()
+
+            report.files.append(pending["path"])
+            checkpoint["last_id"] = pending["ids"][-1]
+            del checkpoint["pending"]
+            self._save_checkpoint(checkpoint)
+            report.archived += len(rows)
+            report.batches += 1
+
+            elapsed = time.monotonic() - batch_started
+            if elapsed > self.max_batch_seconds:
+                chunk_size = max(self.min_chunk_size, chunk_size // 2)
+            elif elapsed < self.max_batch_seconds / 2:
+                chunk_size = min(self.chunk_size, chunk_size * 2)
+            # Duty cycle: leave the database alone for a while between chunks
+            time.sleep(elapsed * self.pause_ratio)
+
+        # Completed: the next run starts over with a fresh cutoff
+        os.remove(self.checkpoint_path)
+        report.finished = True
+        return report
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def login_record_retention(session_factory: Callable[[], Session], **overrides: Any) -> LoginRecordRetention:
+    # Settings, with any constructor keyword overridden (e.g. from the CLI)
+    options = {
+        "max_age_days": settings.RETENTION_MAX_AGE_DAYS,
+        "chunk_size": settings.RETENTION_CHUNK_SIZE,
+        "archive_dir": settings.RETENTION_ARCHIVE_DIR,
+        "archive_format": settings.RETENTION_ARCHIVE_FORMAT,
+        "checkpoint_path": settings.RETENTION_CHECKPOINT_PATH,
+        "max_batch_seconds": settings.RETENTION_MAX_BATCH_SECONDS,
+        "pause_ratio": settings.RETENTION_PAUSE_RATIO,
+    }
+    options.update(overrides)
+    return LoginRecordRetention(session_factory, **options)
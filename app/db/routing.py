@@ -0,0 +1,123 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Read-replica engines picked round-robin, skipping unhealthy ones.
+
+    Health is refreshed by `check()`, which the app runs periodically; a
+    replica that fails the probe gets no reads until it passes again.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], health_timeout: float = 2.0):
+        self.engines = engines
+        self.health_timeout = health_timeout
+        self.healthy = [True] * len(engines)
+        self._next = itertools.count()
+
+        self.primary_reads = 0
+        self.replica_reads = [0] * len(engines)
+        self.failed_checks = [0] * len(engines)
+
+    def choose(self):
+        """Sync engine of the next healthy replica, or None when all are down."""
+        if not self.engines:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self.healthy[index]:
+                self.replica_reads[index] += 1
+                return self.engines[index].sync_engine
+        return None
+
+    async def _probe(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check(self) -> None:
+        for index, engine in enumerate(self.engines):
+            try:
+                await asyncio.wait_for(self._probe(engine), self.health_timeout)
+            except Exception as exc:
+                if self.healthy[index]:
+                    logger.warning("replica %d marked unhealthy: %s", index, exc)
+                self.healthy[index] = False
+                self.failed_checks[index] += 1
+            else:
+                if not self.healthy[index]:
+                    logger.info("replica %d healthy again", index)
+                self.healthy[index] = True
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "replicas": len(self.engines),
+            "healthy": sum(self.healthy),
+            "primary_reads": self.primary_reads,
+        }
+        for index in range(len(self.engines)):
+            stats[f"replica{index}_reads"] = self.replica_reads[index]
+            stats[f"replica{index}_healthy"] = self.healthy[index]
+            stats[f"replica{index}_failed_checks"] = self.failed_checks[index]
+        return stats
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica and everything else to the primary.
+
+    Writes (INSERT/UPDATE/DELETE, flushes, SELECT ... FOR UPDATE, raw SQL)
+    always use the primary bind. After a write, reads stay on the primary
+    for `staleness_window` seconds so the session reads its own writes;
+    `use_primary()` pins a session to the primary outright.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, staleness_window: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.staleness_window = staleness_window
+        self._last_write: float | None = None
+
+    def _reads_from_primary(self) -> bool:
+        if self.info.get("primary"):
+            return True
+        return self._last_write is not None and time.monotonic() - self._last_write < self.staleness_window
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self.replicas is None:
+            return primary
+        plain_select = (
+            clause is not None
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        )
+        if self._flushing or not plain_select:
+            # Treated as a write: this session now needs to see it
+            self._last_write = time.monotonic()
+            return primary
+        if self._reads_from_primary():
+            self.replicas.primary_reads += 1
+            return primary
+        replica = self.replicas.choose()
+        if replica is None:
+            self.replicas.primary_reads += 1
+            return primary
+        return replica
+
+
+def use_primary(session) -> None:
+    """Route every further read of this (sync or async) session to the primary."""
+    getattr(session, "sync_session", session).info["primary"] = True
@@ -1,11 +1,154 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.metrics import histogram, record_sql
+from app.db.routing import ReplicaSet, RoutingSession
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+SYNC_DRIVERS = {"pysqlite", "psycopg2", "pymysql", "mysqldb"}
+
+pool_checkout_wait = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+)
+query_duration = histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements",
+)
+
+
+def get_async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    # Only swap blocking DBAPIs; async-capable drivers in the URL are kept as-is
+    if backend in ASYNC_DRIVERS and parsed.get_driver_name() in SYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    return parsed.render_as_string(hide_password=False)
+
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def _engine_options(url: str, poolclass) -> dict:
+    parsed = make_url(url)
+    options = {}
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.get_driver_name() == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        # In-memory databases live and die with one connection; keep SQLAlchemy's default pool
+        if parsed.database in (None, "", ":memory:"):
+            return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
 
-# for SQLite: check echo only if DEBUG
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    query_duration.observe(elapsed)
+    record_sql(elapsed)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def configure_engine(engine: Engine) -> Engine:
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    stats = {}
+    for key in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, key):
+            stats[key] = getattr(pool, key)()
+    return stats
+
+
+engine = configure_engine(create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL, TimedQueuePool)))
 SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 
+# Non-blocking engine used by the request handlers
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, TimedAsyncQueuePool))
+configure_engine(async_engine.sync_engine)
+
+
+def _replica_engine(url: str):
+    async_url = get_async_database_url(url)
+    replica = create_async_engine(async_url, **_engine_options(async_url, TimedAsyncQueuePool))
+    configure_engine(replica.sync_engine)
+    return replica
+
+
+# Read replicas (async path only); CLIs and background jobs write, so they stay on the primary
+replica_set = ReplicaSet(
+    [_replica_engine(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_set if replica_set.engines else None,
+    staleness_window=settings.DB_REPLICA_STALENESS_SECONDS,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -13,3 +156,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async dependency
+async def get_db_async():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,257 @@
+import contextlib
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.models import login_record  # noqa: F401  (resolves User.login_records)
+from app.models.user import User
+from app.schemas.auth import UserCreate
+from app.utils.security import hash_password
+
+logger = logging.getLogger(__name__)
+
+REPORT_FIELDS = ("line", "email", "username", "reason")
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    chunks: int = 0
+    resumed_from: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.seconds if self.seconds else 0.0
+
+
+class InvalidRow(ValueError):
+    """A JSONL line that is not a JSON object; reported like any other invalid row."""
+
+
+def read_rows(path: str, file_format: str | None = None) -> Iterator[tuple[int, Dict[str, Any] | InvalidRow]]:
+    """Yield (line number, row) from a CSV file with a header or a JSONL file.
+
+    A JSONL line that does not parse to an object is yielded as an
+    InvalidRow instead of aborting the whole import.
+    """
+    file_format = file_format or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        if file_format == "csv":
+            reader = csv.DictReader(fh)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, InvalidRow(f"malformed JSON: {exc}")
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, InvalidRow(f"expected a JSON object, got {type(row).__name__}")
+                    continue
+                yield line_number, row
+
+
+class UserImporter:
+    """Bulk-creates users from CSV/JSONL, `chunk_size` rows per transaction.
+
+    Each chunk is validated with UserCreate and checked for duplicate
+    emails/usernames (within the chunk and against the database) before
+    any hashing. The remaining passwords are hashed across a process pool
+    and the users are inserted with one executemany. After the commit the
+    checkpoint records the last input line, so a rerun skips everything
+    already committed. A crash between commit and checkpoint only makes the
+    rerun report that chunk as duplicates. Rejected rows go to a CSV report.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        source: str,
+        *,
+        file_format: str | None = None,
+        chunk_size: int = 1000,
+        workers: int = 0,
+        checkpoint_path: str | None = None,
+        report_path: str | None = None,
+        login_method: str = "email",
+    ):
+        self.engine = engine
+        self.source = os.path.abspath(source)
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_path = checkpoint_path or f"{source}.import-checkpoint.json"
+        self.report_path = report_path or f"{source}.rejected.csv"
+        self.login_method = login_method
+
+    # --- checkpoint --------------------------------------------------------
+
+    def _load_checkpoint(self) -> Dict[str, Any] | None:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as fh:
+                checkpoint = json.load(fh)
+        except FileNotFoundError:
+            return None
+        if checkpoint.get("source") != self.source:
+            raise RuntimeError(
+                f"checkpoint {self.checkpoint_path} belongs to {checkpoint.get('source')}; "
+                "remove it or pass another checkpoint path"
+            )
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(checkpoint, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # --- rows --------------------------------------------------------------
+
+    def _validate(self, row: Dict[str, Any]) -> UserCreate:
+        data = {key: value for key, value in row.items() if value not in (None, "")}
+        data.setdefault("login_method", self.login_method)
+        # Imports carry one password; there is nobody to type it twice
+        data.setdefault("confirm_password", data.get("password"))
+        return UserCreate(**data)
+
+    def _existing(self, users: list[tuple[int, UserCreate]]) -> tuple[set[str], set[str]]:
+        emails = {user.email for _, user in users}
+        usernames = {user.username for _, user in users}
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(User.email, User.username).where(
+                    or_(User.email.in_(emails), User.username.in_(usernames))
+                )
+            ).all()
+        return {row.email for row in rows}, {row.username for row in rows}
+
+    def _split_duplicates(self, users: list[tuple[int, UserCreate]], rejected: list) -> list[tuple[int, UserCreate]]:
+        taken_emails, taken_usernames = self._existing(users)
+        unique = []
+        for line, user in users:
+            if user.email in taken_emails:
+                rejected.append((line, user.email, user.username, "duplicate email"))
+            elif user.username in taken_usernames:
+                rejected.append((line, user.email, user.username, "duplicate username"))
+            else:
+                # Later rows in the same chunk with these values are duplicates of this one
+                taken_emails.add(user.email)
+                taken_usernames.add(user.username)
+                unique.append((line, user))
+        return unique
+
+    def _insert(self, users: list[tuple[int, UserCreate]], hashes: list[str]) -> None:
+        rows = [
+            {
+                "username": user.username,
+                "email": user.email,
+                "phone_number": user.phone_number,
+                "password_hash": password_hash,
+                "login_method": user.login_method,
+            }
+            for (_, user), password_hash in zip(users, hashes)
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(insert(User), rows)
+
+    def _write_report(self, rejected: list) -> None:
+        if not rejected:
+            return
+        new_file = not os.path.exists(self.report_path)
+        with open(self.report_path, "a", encoding="utf-8", newline="") as fh:
+            writer = csv.writer(fh)
+            if new_file:
+                writer.writerow(REPORT_FIELDS)
+            writer.writerows(rejected)
+
+    # --- main loop ---------------------------------------------------------
+
+    def _chunks(self, start_after: int) -> Iterator[tuple[int, list, list]]:
+        """Yield (last line, valid users, invalid rows) per chunk of input."""
+        users, invalid, last_line = [], [], start_after
+        for line, row in read_rows(self.source, self.file_format):
+            if line <= start_after:
+                continue
+            last_line = line
+            if isinstance(row, InvalidRow):
+                invalid.append((line, None, None, f"invalid: {row}"))
+            else:
+                try:
+                    users.append((line, self._validate(row)))
+                except ValidationError as exc:
+                    reason = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+                    invalid.append((line, row.get("email"), row.get("username"), f"invalid: {reason}"))
+            if len(users) + len(invalid) >= self.chunk_size:
+                yield last_line, users, invalid
+                users, invalid = [], []
+        if users or invalid:
+            yield last_line, users, invalid
+
+    def run(self) -> ImportReport:
+        started = time.monotonic()
+        checkpoint = self._load_checkpoint() or {"source": self.source, "line": 0}
+        report = ImportReport(resumed_from=checkpoint["line"])
+
+        context = multiprocessing.get_context(settings.PASSWORD_POOL_START_METHOD)
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            for last_line, users, rejected in self._chunks(checkpoint["line"]):
+                report.invalid += len(rejected)
+                if users:
+                    unique = self._split_duplicates(users, rejected)
+                    report.duplicates += len(users) - len(unique)
+                    if unique:
+                        passwords = [user.password for _, user in unique]
+                        chunksize = max(1, len(passwords) // (self.workers * 4))
+                        hashes = list(pool.map(hash_password, passwords, chunksize=chunksize))
+                        try:
+                            self._insert(unique, hashes)
+                        except IntegrityError:
+                            # Someone signed up with one of these values since the check
+                            unique = self._insert_one_by_one(unique, hashes, rejected)
+                            report.duplicates += len(hashes) - len(unique)
+                        report.imported += len(unique)
+
+                self._write_report(sorted(rejected, key=lambda item: item[0]))
+                checkpoint["line"] = last_line
+                self._save_checkpoint(checkpoint)
+                report.chunks += 1
+                logger.info("imported through line %d (%d users so far)", last_line, report.imported)
+
+        # Completed: a rerun would start from the top again. Nothing was
+        # written when the input had no rows past the checkpoint.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.checkpoint_path)
+        report.seconds = time.monotonic() - started
+        return report
+
+    def _insert_one_by_one(self, users: list, hashes: list[str], rejected: list) -> list:
+        inserted = []
+        for (line, user), password_hash in zip(users, hashes):
+            try:
+                self._insert([(line, user)], [password_hash])
+            except IntegrityError:
+                rejected.append((line, user.email, user.username, "duplicate"))
+            else:
+                inserted.append((line, user))
+        return inserted
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy import bindparam, insert, update
+
+from app.core.config import settings
+from app.core.exceptions import ServiceBusy
+from app.db.session import AsyncSessionLocal
+from app.models.login_record import LoginRecord
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+_users = User.__table__
+_COUNTER_UPDATE = (
+    update(_users)
+    .where(_users.c.user_id == bindparam("b_user_id"))
+    .values(
+        active_session_count=_users.c.active_session_count + bindparam("b_active"),
+        last_login_at=bindparam("b_last_login"),
+    )
+)
+
+
+@dataclass
+class PendingLoginRecord:
+    """A login record accepted by the writer but not yet in the database."""
+
+    user_id: int
+    username: str
+    email: str
+    login_method: str
+    ip_address: str | None
+    is_active: bool
+    family_id: str | None = None
+    access_jti: str | None = None
+    refresh_jti: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    logged_out_at: datetime | None = None
+    id: int | None = None
+
+
+class LoginRecordWriter:
+    """Write-behind batching for LoginRecord inserts.
+
+    Records are queued and inserted by a background task with one
+    executemany per batch, flushed when `batch_size` records are waiting
+    or `flush_interval` seconds have passed. Until a record is flushed it
+    is served from an in-memory overlay so the session is usable straight
+    after login. The overlay is per process: another worker only sees the
+    record once it has been flushed. A login's first refresh token goes into
+    the same batch, so it can only be used once the batch is written.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        enqueue_timeout: float,
+        max_attempts: int = 3,
+    ):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        # Held while a batch is being written so logout can't race a flush
+        self._flush_lock = asyncio.Lock()
+        self._pending: Dict[int, list[PendingLoginRecord]] = {}
+        self._accepting = False
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.rejected = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.enabled or self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._accepting = True
+        self._task = asyncio.create_task(self._run(), name="login-record-writer")
+
+    async def stop(self) -> None:
+        # Flush everything still queued, then let the background task exit
+        if not self.running:
+            return
+        self._accepting = False
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def enqueue(self, **fields: Any) -> PendingLoginRecord:
+        if not self._accepting:
+            raise ServiceBusy()
+        record = PendingLoginRecord(**fields)
+        # In the overlay before the queue: a slow put yields, and the flusher
+        # may take and forget the record before the put returns
+        self._pending.setdefault(record.user_id, []).append(record)
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            # Backpressure: wait briefly for the flusher, then shed load
+            try:
+                await asyncio.wait_for(self._queue.put(record), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self._forget([record])
+                self.rejected += 1
+                raise ServiceBusy()
+            except asyncio.CancelledError:
+                self._forget([record])
+                raise
+        self.enqueued += 1
+        return record
+
+    def get_active(self, user_id: int) -> list[PendingLoginRecord]:
+        # Newest first, matching the ORDER BY created_at DESC of the DB lookups
+        return [r for r in reversed(self._pending.get(user_id, ())) if r.is_active]
+
+    async def close_user(self, user_id: int, family_id: str | None = None) -> int:
+        """Mark the user's unflushed records inactive; returns how many were active.
+
+        With `family_id` only the record of that session is closed.
+        """
+        closed = 0
+        async with self._flush_lock:
+            for record in self._pending.get(user_id, ()):
+                if record.is_active and family_id in (None, record.family_id):
+                    record.is_active = False
+                    record.logged_out_at = datetime.now(timezone.utc)
+                    closed += 1
+        return closed
+
+    def _drain_into(self, batch: list) -> bool:
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            stopping = item is _STOP
+            batch = [] if stopping else [item]
+            if not stopping:
+                stopping = self._drain_into(batch)
+                if not stopping and len(batch) < self.batch_size:
+                    await asyncio.sleep(self.flush_interval)
+                    stopping = self._drain_into(batch)
+            if batch:
+                await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[PendingLoginRecord]) -> None:
+        async with self._flush_lock:
+            rows = [asdict(record) for record in batch]
+            for row in rows:
+                del row["id"], row["refresh_jti"]
+            tokens = self._refresh_token_rows(batch)
+            counters = self._counter_rows(batch)
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await db.execute(insert(LoginRecord), rows)
+                        if tokens:
+                            await db.execute(insert(RefreshToken), tokens)
+                        await db.execute(_COUNTER_UPDATE, counters)
+                        await db.commit()
+                    self.flushed += len(rows)
+                    self.batches += 1
+                    break
+                except Exception:
+                    self.failed_batches += 1
+                    logger.exception("login record flush failed (attempt %d/%d)", attempt, self.max_attempts)
+                    if attempt == self.max_attempts:
+                        self.dropped += len(rows)
+                    else:
+                        await asyncio.sleep(0.1 * attempt)
+            self._forget(batch)
+
+    @staticmethod
+    def _refresh_token_rows(batch: list[PendingLoginRecord]) -> list[Dict[str, Any]]:
+        # A session closed before the flush gets its refresh token already revoked
+        expires_in = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        return [
+            {
+                "jti": record.refresh_jti,
+                "family_id": record.family_id or record.refresh_jti,
+                "user_id": record.user_id,
+                "expires_at": record.created_at + expires_in,
+                "revoked_at": None if record.is_active else record.logged_out_at,
+            }
+            for record in batch
+            if record.refresh_jti is not None
+        ]
+
+    @staticmethod
+    def _counter_rows(batch: list[PendingLoginRecord]) -> list[Dict[str, Any]]:
+        # One counter row per user, applied in the same transaction as the insert
+        counters: Dict[int, Dict[str, Any]] = {}
+        for record in batch:
+            row = counters.setdefault(
+                record.user_id,
+                {"b_user_id": record.user_id, "b_active": 0, "b_last_login": record.created_at},
+            )
+            row["b_active"] += int(record.is_active)
+            row["b_last_login"] = max(row["b_last_login"], record.created_at)
+        return list(counters.values())
+
+    def _forget(self, batch: list[PendingLoginRecord]) -> None:
+        for record in batch:
+            records = self._pending.get(record.user_id)
+            if records is None:
+                continue
+            # Compared by identity: two logins can produce equal dataclasses
+            records[:] = [r for r in records if r is not record]
+            if not records:
+                del self._pending[record.user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "pending_users": len(self._pending),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+        }
+
+
+login_record_writer = LoginRecordWriter(
+    enabled=settings.LOGIN_RECORD_WRITE_BEHIND,
+    batch_size=settings.LOGIN_RECORD_BATCH_SIZE,
+    flush_interval=settings.LOGIN_RECORD_FLUSH_INTERVAL_MS / 1000,
+    max_queue=settings.LOGIN_RECORD_QUEUE_SIZE,
+    enqueue_timeout=settings.LOGIN_RECORD_ENQUEUE_TIMEOUT_MS / 1000,
+)
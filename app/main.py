@@ -1,27 +1,101 @@
+import asyncio
+
 from fastapi import FastAPI
 from app.core.config import settings
+from app.core.audit import audit_bus
+from app.core.cache import principal_cache
 from app.core.error_handlers import register_exception_handlers
-from app.db.session import engine
-from app.db.base import Base
-from app.api.v1 import auth, other  # import all routers here
+from app.core.metrics import register_stats
+from app.core.rate_limit import introspect_rate_limiter, login_rate_limiter
+from app.core.middleware import RequestMetricsMiddleware
+from app.core.revocation import revocation_list
+from app.core.scheduler import PeriodicTask
+from app.crud.refresh_token import purge_expired_refresh_tokens_async
+from app.db.retention import login_record_retention
+from app.core.response import FastJSONResponse
+from app.db.migrations import check_schema_version
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, pool_stats, replica_set
+from app.db.write_behind import login_record_writer
+from app.utils.security import jwt_keyring, password_pool
+from app.api.v1 import auth, other, metrics, jwks  # import all routers here
 
 # Define one common prefix (applies to all APIs)
 API_PREFIX = "/auth"
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Auth API", debug=settings.DEBUG)
+    app = FastAPI(title="Auth API", debug=settings.DEBUG, default_response_class=FastJSONResponse)
 
     # ✅ Include all routers under one common prefix
     app.include_router(auth.router, prefix=API_PREFIX, tags=["Auth"])
     app.include_router(other.router, prefix=API_PREFIX, tags=["Auth"])
+    app.include_router(jwks.router)
 
     # Register custom error handlers
     register_exception_handlers(app)
 
+    if settings.METRICS_ENABLED:
+        app.add_middleware(RequestMetricsMiddleware, server_timing=settings.SERVER_TIMING_HEADER)
+        if settings.METRICS_TOKEN:
+            app.include_router(metrics.router)
+        register_stats("password_pool", password_pool.stats)
+        register_stats("principal_cache", principal_cache.stats)
+        register_stats("login_record_writer", login_record_writer.stats)
+        register_stats("revocation_list", revocation_list.stats)
+        register_stats("login_rate_limit", login_rate_limiter.stats)
+        register_stats("introspect_rate_limit", introspect_rate_limiter.stats)
+        register_stats("audit", audit_bus.stats)
+        register_stats("db_pool", lambda: pool_stats(async_engine.sync_engine))
+        if replica_set.engines:
+            register_stats("db_replicas", replica_set.stats)
+
+    async def purge_refresh_tokens():
+        async with AsyncSessionLocal() as db:
+            await purge_expired_refresh_tokens_async(db, batch_size=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE)
+
+    refresh_token_purge = PeriodicTask(
+        "refresh-token-purge", settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS, purge_refresh_tokens
+    )
+
+    async def run_retention():
+        # Blocking job (sync engine, file I/O); keep it off the event loop
+        await asyncio.to_thread(login_record_retention(SessionLocal).run)
+
+    retention = PeriodicTask("login-record-retention", settings.RETENTION_INTERVAL_SECONDS, run_retention)
+
+    replica_health = PeriodicTask(
+        "replica-health",
+        settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS if replica_set.engines else 0,
+        replica_set.check,
+    )
+
     @app.on_event("startup")
-    def on_startup():
-        # Create DB tables if not exist
-        Base.metadata.create_all(bind=engine)
+    async def on_startup():
+        # Schema changes are applied by prestart.py; workers only compare revisions
+        await check_schema_version(async_engine)
+        # Parse the JWT keys now so a bad key directory fails the boot, not the first login
+        jwt_keyring.load()
+        # Spawn bcrypt workers up front instead of on the first login
+        password_pool.warm_up()
+        await login_record_writer.start()
+        await audit_bus.start()
+        # Replay (and compact) persisted revocations before serving stateless tokens
+        revocation_list.load()
+        refresh_token_purge.start()
+        retention.start()
+        replica_health.start()
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await refresh_token_purge.stop()
+        await retention.stop()
+        await replica_health.stop()
+        # Flush queued login records before the engine goes away
+        await login_record_writer.stop()
+        # Drain queued audit events while the engine is still up
+        await audit_bus.stop()
+        password_pool.shutdown()
+        await async_engine.dispose()
+        await replica_set.dispose()
 
     return app
 
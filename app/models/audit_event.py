@@ -0,0 +1,15 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+
+from app.db.base import Base
+
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True)
+    event = Column(String(32), nullable=False, index=True)
+    # No foreign key: failed logins have no user, and the trail outlives deleted users
+    user_id = Column(Integer, nullable=True, index=True)
+    ip_address = Column(String(45), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    details = Column(JSON(none_as_null=True), nullable=True)
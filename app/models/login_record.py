@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index, func, text
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -6,9 +6,25 @@ from app.db.base import Base
 
 class LoginRecord(Base):
     __tablename__ = "login_records"
+    # Hottest-write table: every index here is paid on each login. All of them
+    # lead with user_id, which also covers the foreign key
+    __table_args__ = (
+        # Active-session lookups: WHERE user_id = ? AND is_active ORDER BY created_at DESC
+        Index("ix_login_records_user_active_created", "user_id", "is_active", "created_at"),
+        # Same lookup over active rows only (partial index on PostgreSQL/SQLite)
+        Index(
+            "ix_login_records_active_user_created",
+            "user_id",
+            "created_at",
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
+        # Session listing: keyset pages over (created_at, id) per user
+        Index("ix_login_records_user_created_id", "user_id", "created_at", "id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
     username = Column(String(50), nullable=False)
     email = Column(String(255), nullable=False)
     login_method = Column(String(50), nullable=False)
@@ -16,5 +32,9 @@ class LoginRecord(Base):
     is_active = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     logged_out_at = Column(DateTime(timezone=True), nullable=True)
+    # Refresh-token family (also the `sid` claim of the session's tokens) and the
+    # login's access token; revoking the session revokes both
+    family_id = Column(String(36), nullable=True)
+    access_jti = Column(String(36), nullable=True)
 
     user = relationship("User", back_populates="login_records")
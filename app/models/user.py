@@ -16,5 +16,8 @@ class User(Base):
     login_method = Column(String(50), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Denormalized from login_records; maintained by crud.other, repaired by reconcile_counters.py
+    active_session_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_login_at = Column(DateTime(timezone=True), nullable=True)
 
     login_records = relationship("LoginRecord", back_populates="user", cascade="all, delete-orphan")
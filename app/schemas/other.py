@@ -1,5 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 class TokenRefresh(BaseModel):
     pass  # Empty class since we'll use Authorization header
+
+
+class TokenIntrospect(BaseModel):
+    tokens: list[str] = Field(..., min_length=1, max_length=settings.INTROSPECT_MAX_TOKENS)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import jwt
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+except ImportError:  # only needed for EdDSA/ES256 (pip install "PyJWT[crypto]")
+    serialization = None
+
+logger = logging.getLogger(__name__)
+
+SYMMETRIC_ALGORITHM = "HS256"
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str | None
+    algorithm: str
+    signing_key: Any | None  # None for verify-only (retired) keys
+    verifying_key: Any
+
+
+def _algorithm_for(key: Any) -> str:
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name == "secp256r1":
+        return "ES256"
+    raise ValueError(f"unsupported JWT key type {type(key).__name__}; use Ed25519 or P-256")
+
+
+def _load_key_file(path: str) -> tuple[Any | None, Any]:
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if path.endswith(".pub.pem"):
+        return None, serialization.load_pem_public_key(data)
+    private_key = serialization.load_pem_private_key(data, password=None)
+    return private_key, private_key.public_key()
+
+
+class KeyRing:
+    """JWT signing and verification keys, indexed by `kid`.
+
+    With an asymmetric algorithm the keys are read once from `key_dir`:
+    `<kid>.pem` holds a private key (can sign and verify) and
+    `<kid>.pub.pem` a public key only (verifies tokens of a retired key).
+    Parsed key objects are kept, so nothing is re-parsed per token.
+    Tokens are signed with `active_kid` (default: the last kid in sort
+    order) and verified by the kid in their header, which lets a new key be
+    rolled out before it signs anything and an old one kept until its
+    tokens have expired. Tokens without a kid are HS256 tokens from before
+    the switch and are accepted only while `accept_hs256` is on, which is
+    meant for the migration window.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        *,
+        secret: str,
+        key_dir: str | None = None,
+        active_kid: str | None = None,
+        accept_hs256: bool = False,
+    ):
+        self.algorithm = algorithm
+        self.secret = secret
+        self.key_dir = key_dir
+        self.active_kid = active_kid
+        self.accept_hs256 = accept_hs256 or algorithm == SYMMETRIC_ALGORITHM
+        self._keys: Dict[str, JWTKey] = {}
+        self._signing: JWTKey | None = None
+        self._jwks: tuple[bytes, str] | None = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        if self.algorithm == SYMMETRIC_ALGORITHM:
+            keys, signing = {}, JWTKey(None, SYMMETRIC_ALGORITHM, self.secret, self.secret)
+        elif self.algorithm in ASYMMETRIC_ALGORITHMS:
+            keys, signing = self._load_asymmetric()
+        else:
+            raise ValueError(f"unsupported JWT_ALGORITHM {self.algorithm!r}")
+        if self.accept_hs256 and self.algorithm != SYMMETRIC_ALGORITHM:
+            logger.warning(
+                "accepting kid-less HS256 tokens alongside %s; disable JWT_ACCEPT_HS256 "
+                "once tokens issued before the switch have expired", self.algorithm
+            )
+        with self._lock:
+            self._keys, self._signing, self._jwks = keys, signing, None
+
+    def _load_asymmetric(self) -> tuple[Dict[str, JWTKey], JWTKey]:
+        if serialization is None:
+            raise RuntimeError(f"{self.algorithm} tokens need the cryptography package (PyJWT[crypto])")
+        if not self.key_dir or not os.path.isdir(self.key_dir):
+            raise RuntimeError(f"JWT key directory {self.key_dir!r} does not exist")
+
+        keys: Dict[str, JWTKey] = {}
+        for name in sorted(os.listdir(self.key_dir)):
+            if not name.endswith(".pem"):
+                continue
+            kid = name[: -len(".pub.pem")] if name.endswith(".pub.pem") else name[: -len(".pem")]
+            if kid in keys and keys[kid].signing_key is not None:
+                continue  # a private key already covers this kid
+            signing_key, verifying_key = _load_key_file(os.path.join(self.key_dir, name))
+            keys[kid] = JWTKey(kid, _algorithm_for(verifying_key), signing_key, verifying_key)
+
+        signers = [key for key in keys.values() if key.signing_key is not None and key.algorithm == self.algorithm]
+        if not signers:
+            raise RuntimeError(f"no {self.algorithm} private key in {self.key_dir}")
+        if self.active_kid:
+            signing = keys.get(self.active_kid)
+            if signing is None or signing not in signers:
+                raise RuntimeError(f"JWT_ACTIVE_KID {self.active_kid!r} is not a {self.algorithm} private key")
+        else:
+            signing = signers[-1]
+        return keys, signing
+
+    def _ensure_loaded(self) -> None:
+        if self._signing is None:
+            self.load()
+
+    def sign(self, payload: Dict[str, Any]) -> str:
+        self._ensure_loaded()
+        key = self._signing
+        headers = {"kid": key.kid} if key.kid else None
+        return jwt.encode(payload, key.signing_key, algorithm=key.algorithm, headers=headers)
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        self._ensure_loaded()
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            if not self.accept_hs256:
+                raise jwt.InvalidTokenError("token has no kid")
+            return jwt.decode(token, self.secret, algorithms=[SYMMETRIC_ALGORITHM])
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError("unknown signing key")
+        # Pinning the algorithm to the key rules out algorithm-confusion tricks
+        return jwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
+
+    def jwks(self) -> tuple[bytes, str]:
+        """Serialized JWK Set of the public keys and its ETag, built once per load."""
+        self._ensure_loaded()
+        with self._lock:
+            if self._jwks is None:
+                keys = []
+                for key in self._keys.values():
+                    jwk = jwt.get_algorithm_by_name(key.algorithm).to_jwk(key.verifying_key, as_dict=True)
+                    keys.append({**jwk, "kid": key.kid, "alg": key.algorithm, "use": "sig"})
+                body = json.dumps({"keys": keys}, separators=(",", ":"), sort_keys=True).encode()
+                self._jwks = body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            return self._jwks
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._keys),
+            "signing_kid": self._signing.kid if self._signing else None,
+        }
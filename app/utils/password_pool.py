@@ -0,0 +1,84 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core.exceptions import ServiceBusy
+
+
+class BoundedProcessPool:
+    """ProcessPoolExecutor wrapper with a hard cap on queued work.
+
+    `max_workers` tasks run at once and at most `max_queue` more may wait;
+    anything beyond that is rejected immediately instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, start_method: str = "spawn"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.start_method = start_method
+        self._executor: ProcessPoolExecutor | None = None
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ServiceBusy()
+
+        self.in_flight += 1
+        self.submitted += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    def warm_up(self) -> None:
+        # Start every worker now so the first logins don't pay process spawn cost
+        executor = self._get_executor()
+        for future in [executor.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.max_workers, 0),
+            "max_in_flight": self.max_in_flight,
+            "saturation": self.in_flight / self.capacity,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
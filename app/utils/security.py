@@ -2,14 +2,31 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 from uuid import uuid4
 
-import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
-
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-ALGORITHM = "HS256"
+from app.core.metrics import timed
+from app.utils.keyring import KeyRing
+from app.utils.password_pool import BoundedProcessPool
+
+
+# min/max equal to the default rounds make needs_update() flag hashes made with any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Parsed signing/verification keys, loaded once per process (see KeyRing)
+jwt_keyring = KeyRing(
+    settings.JWT_ALGORITHM,
+    secret=settings.JWT_SECRET_KEY,
+    key_dir=settings.JWT_KEY_DIR,
+    active_kid=settings.JWT_ACTIVE_KID,
+    accept_hs256=settings.JWT_ACCEPT_HS256,
+)
 
 
 def hash_password(password: str) -> str:
@@ -23,6 +40,44 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(safe_pw, hashed_password)
 
 
+def password_needs_update(hashed_password: str) -> bool:
+    # Only parses the hash, no bcrypt work
+    return pwd_context.needs_update(hashed_password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> tuple[bool, bool]:
+    """Verify a password and report whether its hash should be replaced.
+
+    Returns ``(valid, needs_update)``; ``needs_update`` is only ever true for
+    a valid password, since rehashing needs the plaintext.
+    """
+    valid = verify_password(plain_password, hashed_password)
+    return valid, valid and password_needs_update(hashed_password)
+
+
+password_pool = BoundedProcessPool(
+    max_workers=settings.PASSWORD_POOL_SIZE,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+    start_method=settings.PASSWORD_POOL_START_METHOD,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    # Runs bcrypt in a worker process; raises ServiceBusy when the pool queue is full
+    with timed("bcrypt"):
+        return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    with timed("bcrypt"):
+        return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def check_password_async(plain_password: str, hashed_password: str) -> tuple[bool, bool]:
+    with timed("bcrypt"):
+        return await password_pool.run(check_password, plain_password, hashed_password)
+
+
 def _create_token(
     payload: Dict[str, Any],
     expires_delta: timedelta,
@@ -31,28 +86,37 @@ def _create_token(
     id: str | None = None,
 ) -> str:
     to_encode = payload.copy()
+    now = datetime.now(timezone.utc)
     to_encode.update(
         {
             "type": token_type,
-            "exp": datetime.now(timezone.utc) + expires_delta,
+            # Sub-second iat so a logout epoch can't also revoke a login in the same second
+            "iat": round(now.timestamp(), 3),
+            "exp": now + expires_delta,
         }
     )
     if id is not None:
         to_encode["jti"] = id
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=ALGORITHM)
+    with timed("jwt"):
+        return jwt_keyring.sign(to_encode)
 
 
-def create_access_token(subject: str) -> tuple[str, str]:
+def create_access_token(subject: str, claims: Dict[str, Any] | None = None) -> tuple[str, str]:
+    # `claims` (username, email) let stateless validation build the principal without the DB
     expire = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     id = str(uuid4())
-    token = _create_token({"sub": subject}, expire, "access", id=id)
+    token = _create_token({**(claims or {}), "sub": subject}, expire, "access", id=id)
     return token, id
 
 
-def create_refresh_token(subject: str) -> str:
+def create_refresh_token(subject: str, claims: Dict[str, Any] | None = None) -> tuple[str, str]:
+    # The jti keys the refresh_tokens row used for rotation and reuse detection
     expire = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    return _create_token({"sub": subject}, expire, "refresh")
+    id = str(uuid4())
+    token = _create_token({**(claims or {}), "sub": subject}, expire, "refresh", id=id)
+    return token, id
 
 
 def decode_token(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
+    with timed("jwt"):
+        return jwt_keyring.verify(token)
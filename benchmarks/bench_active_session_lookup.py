@@ -0,0 +1,109 @@
+"""Active-session lookup latency as a user's login history grows.
+
+Seeds one user with 10 .. 100k login records (a handful active) and times
+`get_active_login_record` with and without the session indexes from
+migration 0002. Without them the lookup falls back to the (user_id,
+created_at, id) listing index.
+
+    python -m benchmarks.bench_active_session_lookup [--json out.json]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import percentiles, use_temp_database, write_json
+
+use_temp_database("active_sessions.db")
+
+from sqlalchemy import insert, text  # noqa: E402
+
+from app.crud import other as crud_other  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.login_record import LoginRecord  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+SESSION_INDEXES = ("ix_login_records_user_active_created", "ix_login_records_active_user_created")
+USER_ID = 1
+
+
+def seed(rows: int, active: int = 3) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    active_rows = set(random.sample(range(rows), min(active, rows)))
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "user_id": USER_ID, "username": "bench", "email": "bench@example.com",
+            "phone_number": "0000000", "password_hash": "x", "login_method": "email",
+        }])
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "user_id": USER_ID, "username": "bench", "email": "bench@example.com",
+                "login_method": "email", "ip_address": "127.0.0.1",
+                "is_active": i in active_rows, "created_at": start + timedelta(seconds=i),
+            })
+            if len(batch) == 10_000:
+                conn.execute(insert(LoginRecord), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(LoginRecord), batch)
+        conn.execute(text("ANALYZE"))
+
+
+def drop_session_indexes() -> None:
+    with engine.begin() as conn:
+        for name in SESSION_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text("ANALYZE"))
+
+
+def query_plan() -> str:
+    with SessionLocal() as db:
+        stmt = db.query(LoginRecord).filter(
+            LoginRecord.user_id == USER_ID, LoginRecord.is_active == True
+        ).order_by(LoginRecord.created_at.desc()).limit(1).statement
+        compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+        rows = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return "; ".join(row[-1] for row in rows)
+
+
+def measure(iterations: int) -> dict:
+    samples = []
+    db = SessionLocal()
+    try:
+        for _ in range(iterations):
+            db.expunge_all()
+            started = time.perf_counter()
+            crud_other.get_active_login_record(db, USER_ID)
+            samples.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    return {**percentiles(samples), "plan": query_plan()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows/user':>10} {'variant':>10} {'p50 ms':>9} {'p95 ms':>9}  plan")
+    for rows in [int(n) for n in args.sizes.split(",")]:
+        seed(rows)
+        for variant in ("indexed", "baseline"):
+            if variant == "baseline":
+                drop_session_indexes()
+            stats = measure(args.iterations)
+            results.append({"rows_per_user": rows, "variant": variant, **stats})
+            print(f"{rows:>10} {variant:>10} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f}  {stats['plan']}")
+
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
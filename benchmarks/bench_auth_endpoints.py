@@ -0,0 +1,275 @@
+"""Throughput and latency of the /auth endpoints.
+
+Seeds a temporary SQLite database with N users and M login records per
+user, then drives /auth/signup, /auth/login, /auth/refresh, /auth/me and
+/auth/logout either in-process (httpx ASGITransport against create_app())
+or through a real uvicorn worker, or both. Reports p50/p95/p99 latency,
+requests/second and, in-process, SQL statements per request. Results are
+written as JSON so runs can be diffed in CI.
+
+Needs httpx (`pip install httpx`).
+
+    python -m benchmarks.bench_auth_endpoints --users 1000 --records 20 \\
+        --requests 200 --concurrency 16 --mode both --json bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import percentiles, use_temp_database, write_json
+
+DB_PATH = use_temp_database("auth_endpoints.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import async_engine, engine  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.models.login_record import LoginRecord  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.security import hash_password  # noqa: E402
+
+PASSWORD = "benchmark-password"
+ENDPOINTS = ("signup", "login", "refresh", "me", "logout")
+
+
+class StatementCounter:
+    """Counts SQL statements sent by both engines of this process."""
+
+    def __init__(self):
+        self.count = 0
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed(users: int, records: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    password_hash = hash_password(PASSWORD)  # one bcrypt for the whole seed
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "user_id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+                "phone_number": "5550000000", "password_hash": password_hash, "login_method": "email",
+            }
+            for i in range(1, users + 1)
+        ])
+        batch = []
+        for i in range(1, users + 1):
+            for j in range(records):
+                batch.append({
+                    "user_id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+                    "login_method": "email", "ip_address": "127.0.0.1",
+                    "is_active": j == records - 1, "created_at": start + timedelta(minutes=j),
+                })
+            if len(batch) >= 10_000:
+                conn.execute(insert(LoginRecord), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(LoginRecord), batch)
+
+
+async def run_requests(client: httpx.AsyncClient, requests: list, concurrency: int, counter=None) -> dict:
+    """Send (method, url, kwargs, on_response) tuples with bounded concurrency."""
+    latencies, errors, statuses = [], 0, {}
+    queue = iter(requests)
+    sql_before = counter.count if counter else None
+
+    async def worker():
+        nonlocal errors
+        for method, url, kwargs, on_response in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+            elif on_response is not None:
+                on_response(response.json())
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_started
+
+    result = {**percentiles(latencies), "requests_per_second": len(latencies) / wall if wall else 0.0,
+              "errors": errors, "status_codes": statuses}
+    if counter is not None and latencies:
+        result["sql_statements_per_request"] = (counter.count - sql_before) / len(latencies)
+    return result
+
+
+async def login_tokens(client: httpx.AsyncClient, user_ids: list[int], concurrency: int) -> list[dict]:
+    tokens = []
+    requests = [
+        ("POST", "/auth/login",
+         {"json": {"email": f"user{i}@example.com", "password": PASSWORD, "login_method": "email"}},
+         lambda body: tokens.append(body["data"]))
+        for i in user_ids
+    ]
+    await run_requests(client, requests, concurrency)
+    return tokens
+
+
+async def run_suite(client: httpx.AsyncClient, args, counter=None, label: str = "") -> dict:
+    results = {}
+    user_ids = list(range(1, args.users + 1))
+    run_id = f"{label}{int(time.time() * 1000) % 1_000_000}"
+    n = args.requests
+
+    results["signup"] = await run_requests(client, [
+        ("POST", "/auth/signup", {"json": {
+            "username": f"new{run_id}_{i}", "email": f"new{run_id}_{i}@example.com",
+            "phone_number": "5550000000", "password": PASSWORD, "confirm_password": PASSWORD,
+            "login_method": "email",
+        }}, None)
+        for i in range(n)
+    ], args.concurrency, counter)
+
+    results["login"] = await run_requests(client, [
+        ("POST", "/auth/login",
+         {"json": {"email": f"user{random.choice(user_ids)}@example.com", "password": PASSWORD,
+                   "login_method": "email"}}, None)
+        for _ in range(n)
+    ], args.concurrency, counter)
+
+    # Untimed: one session per user we will refresh/query/log out with
+    session_users = random.sample(user_ids, min(n, len(user_ids)))
+    tokens = await login_tokens(client, session_users, args.concurrency)
+
+    # Refresh tokens may be single-use, so each response feeds the next request
+    refresh_pool = [t["refresh_token"] for t in tokens]
+
+    def refresh_requests():
+        for _ in range(n):
+            if not refresh_pool:
+                return
+            token = refresh_pool.pop()
+            yield ("POST", "/auth/refresh", {"headers": {"Authorization": f"Bearer {token}"}},
+                   lambda body: refresh_pool.insert(0, body["data"]["refresh_token"]))
+
+    results["refresh"] = await run_requests(client, refresh_requests(), args.concurrency, counter)
+
+    access = itertools.cycle([t["access_token"] for t in tokens])
+    results["me"] = await run_requests(client, [
+        ("GET", "/auth/me", {"headers": {"Authorization": f"Bearer {next(access)}"}}, None)
+        for _ in range(n)
+    ], args.concurrency, counter)
+
+    # Logout closes every session of the user, so each token is used once
+    results["logout"] = await run_requests(client, [
+        ("POST", "/auth/logout", {"headers": {"Authorization": f"Bearer {t['access_token']}"}}, None)
+        for t in tokens
+    ], args.concurrency, counter)
+    return results
+
+
+async def run_in_process(args) -> dict:
+    app = create_app()
+    counter = StatementCounter()
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_suite(client, args, counter, label="ip")
+    finally:
+        await app.router.shutdown()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(args) -> dict:
+    port = free_port()
+    env = dict(os.environ)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/openapi.json")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("uvicorn did not become ready")
+                await asyncio.sleep(0.1)
+            return await run_suite(client, args, label="uv")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def print_table(mode: str, results: dict) -> None:
+    print(f"\n[{mode}]")
+    print(f"{'endpoint':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'sql/req':>8} {'errors':>7}")
+    for name in ENDPOINTS:
+        r = results.get(name, {})
+        if not r.get("count"):
+            print(f"{name:<10} {'-':>9}")
+            continue
+        sql = r.get("sql_statements_per_request")
+        print(f"{name:<10} {r['requests_per_second']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {'-' if sql is None else f'{sql:.2f}':>8} {r['errors']:>7}")
+
+
+async def main_async(args) -> dict:
+    seed(args.users, args.records)
+    output = {
+        "config": {k: v for k, v in vars(args).items() if k != "json_path"},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count(), "database": DB_PATH},
+        "results": {},
+    }
+    if args.mode in ("inprocess", "both"):
+        output["results"]["inprocess"] = await run_in_process(args)
+        print_table("inprocess", output["results"]["inprocess"])
+    if args.mode in ("uvicorn", "both"):
+        output["results"]["uvicorn"] = await run_uvicorn(args)
+        print_table("uvicorn", output["results"]["uvicorn"])
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--records", type=int, default=10, help="login records per seeded user")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn", "both"), default="inprocess")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    write_json(args.json_path, asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cost of building error responses: pre-serialized bodies vs encoding per call.
+
+Times `error_response` for detail-free errors (served from the encoded
+body cache) against building the same payload with FastJSONResponse on
+every call, which is what every error cost before the cache. The cached
+side also pays for the per-code error counter. With orjson a body this
+small encodes about as fast as it is counted; the gap shows with
+JSON_RESPONSE_BACKEND=json.
+
+    python -m benchmarks.bench_error_responses --iterations 100000 --json errors.json
+"""
+import argparse
+import os
+import platform
+import time
+
+from benchmarks.common import write_json
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+from app.core.response import JSON_BACKEND, FastJSONResponse, error_response  # noqa: E402
+
+CASES = (
+    ("Invalid token", "INVALID_TOKEN", 401),
+    ("Token has expired", "TOKEN_EXPIRED", 401),
+    ("Invalid credentials", "INVALID_CREDENTIALS", 401),
+)
+
+
+def rate(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def encoded(error: str, code: str, status_code: int) -> FastJSONResponse:
+    return FastJSONResponse(status_code=status_code, content={"status": False, "error": error, "code": code})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'code':<22} {'cached/s':>10} {'encoded/s':>10} {'speedup':>8}")
+    for error, code, status_code in CASES:
+        cached = rate(lambda: error_response(error, code, status_code), args.iterations)
+        plain = rate(lambda: encoded(error, code, status_code), args.iterations)
+        results[code] = {"cached_per_second": cached, "encoded_per_second": plain}
+        print(f"{code:<22} {cached:>10.0f} {plain:>10.0f} {cached / plain:>7.2f}x")
+
+    write_json(args.json_path, {
+        "config": {"iterations": args.iterations, "json_backend": JSON_BACKEND},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
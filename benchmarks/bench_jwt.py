@@ -0,0 +1,108 @@
+"""JWT sign/verify throughput per algorithm.
+
+Builds a KeyRing for HS256, EdDSA and ES256 with a freshly generated key
+and times `sign` and `verify` on a token shaped like our access tokens.
+The `pem` rows pass the PEM text to PyJWT on every call instead of the
+cached key object, which is what re-parsing per call would cost.
+
+    python -m benchmarks.bench_jwt --iterations 5000 --json jwt.json
+"""
+import argparse
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import write_json
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+import jwt  # noqa: E402
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+
+from app.utils.keyring import KeyRing  # noqa: E402
+from generate_jwt_key import generate_key  # noqa: E402
+
+ALGORITHMS = ("HS256", "EdDSA", "ES256")
+
+
+def claims() -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "sub": "12345", "username": "user12345", "email": "user12345@example.com",
+        "type": "access", "iat": round(now.timestamp(), 3), "exp": now + timedelta(hours=1),
+        "jti": "0f8fad5b-d9cb-469f-a165-70867728950e",
+    }
+
+
+def keyring_for(algorithm: str) -> tuple[KeyRing, bytes | None]:
+    if algorithm == "HS256":
+        keyring = KeyRing(algorithm, secret="bench-secret")
+        keyring.load()
+        return keyring, None
+    key_dir = tempfile.mkdtemp(prefix="webbuilder-jwt-")
+    pem = generate_key(algorithm).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    with open(os.path.join(key_dir, "bench.pem"), "wb") as fh:
+        fh.write(pem)
+    keyring = KeyRing(algorithm, secret="bench-secret", key_dir=key_dir)
+    keyring.load()
+    return keyring, pem
+
+
+def rate(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def bench(algorithm: str, iterations: int) -> dict:
+    keyring, pem = keyring_for(algorithm)
+    payload = claims()
+    token = keyring.sign(payload)
+    result = {
+        "sign_per_second": rate(lambda: keyring.sign(payload), iterations),
+        "verify_per_second": rate(lambda: keyring.verify(token), iterations),
+        "token_bytes": len(token),
+    }
+    if pem is not None:
+        public_pem = serialization.load_pem_private_key(pem, None).public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        result["pem_sign_per_second"] = rate(lambda: jwt.encode(payload, pem, algorithm=algorithm), iterations)
+        result["pem_verify_per_second"] = rate(
+            lambda: jwt.decode(token, public_pem, algorithms=[algorithm]), iterations
+        )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'algorithm':<10} {'sign/s':>10} {'verify/s':>10} {'pem sign/s':>11} {'pem verify/s':>13} {'bytes':>6}")
+    for algorithm in args.algorithms:
+        r = results[algorithm] = bench(algorithm, args.iterations)
+        pem_sign = f"{r['pem_sign_per_second']:.0f}" if "pem_sign_per_second" in r else "-"
+        pem_verify = f"{r['pem_verify_per_second']:.0f}" if "pem_verify_per_second" in r else "-"
+        print(f"{algorithm:<10} {r['sign_per_second']:>10.0f} {r['verify_per_second']:>10.0f} "
+              f"{pem_sign:>11} {pem_verify:>13} {r['token_bytes']:>6}")
+
+    write_json(args.json_path, {
+        "config": {"iterations": args.iterations, "algorithms": args.algorithms},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-response serialization cost of the available JSON encoders.
+
+Builds a `/me`-shaped success response and times rendering it with the
+stdlib JSONResponse (datetimes pre-converted with isoformat(), as the
+handlers used to do) against FastJSONResponse on each installed backend.
+
+    python -m benchmarks.bench_response_serialization [--json out.json]
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from benchmarks.common import use_temp_database, write_json
+
+use_temp_database("serialization.db")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core import response  # noqa: E402
+
+
+def user_payload() -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "user_id": 42,
+        "username": "benchmark-user",
+        "email": "benchmark@example.com",
+        "phone_number": "+15550000000",
+        "login_method": "email",
+        "created_at": now,
+        "updated_at": now,
+        "active_sessions": 3,
+        "last_login": now,
+        "request_id": uuid4(),
+    }
+
+
+def stdlib_baseline(data: dict):
+    converted = {
+        key: value.isoformat() if isinstance(value, datetime) else str(value) if key == "request_id" else value
+        for key, value in data.items()
+    }
+    return JSONResponse(status_code=200, content={"status": True, "message": "ok", "data": converted})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50_000)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    data = user_payload()
+    results = []
+
+    def record(label: str, fn) -> None:
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=3))
+        per_call_us = seconds / args.number * 1e6
+        results.append({"encoder": label, "us_per_response": per_call_us})
+        print(f"{label:<36} {per_call_us:8.2f} us/response")
+
+    record("JSONResponse (stdlib, isoformat)", lambda: stdlib_baseline(data))
+    for name in ("json", "msgspec", "orjson"):
+        backend, dumps = response._select_backend(name)
+        if backend != name:
+            continue  # not installed
+        # FastJSONResponse.render looks the encoder up at call time
+        response.json_dumps = dumps
+        record(
+            f"FastJSONResponse ({backend})",
+            lambda: response.FastJSONResponse(content={"status": True, "message": "ok", "data": data}),
+        )
+
+    write_json(args.json_path, results)
+
+
+if __name__ == "__main__":
+    main()
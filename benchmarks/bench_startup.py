@@ -0,0 +1,142 @@
+"""Worker startup cost: import time, startup hooks and time to first request.
+
+Each sample is a fresh interpreter, as a newly spawned uvicorn worker
+would be. The database is migrated once up front (as prestart.py does),
+then every variant boots against it:
+
+  check    startup with the Alembic revision check (DB_SCHEMA_CHECK=warn)
+  nocheck  startup with DB_SCHEMA_CHECK=off
+  legacy   Base.metadata.create_all() before startup, as workers used to do
+
+The first request is an authenticated GET /auth/me, so it also pays for
+the first pooled connection. Needs httpx (`pip install httpx`).
+
+    python -m benchmarks.bench_startup --samples 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+VARIANTS = ("check", "nocheck", "legacy")
+PHASES = ("import", "startup", "first_request", "total")
+
+
+def child(variant: str, token: str) -> None:
+    # Runs in the spawned interpreter; prints one JSON line of phase timings in seconds
+    started = time.perf_counter()
+    import asyncio
+
+    import httpx
+
+    from app.main import create_app
+
+    imported = time.perf_counter()
+
+    async def boot() -> dict:
+        app = create_app()
+        if variant == "legacy":
+            from app.db.base import Base
+            from app.db.session import engine
+
+            Base.metadata.create_all(bind=engine)
+        await app.router.startup()
+        ready = time.perf_counter()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+                response.raise_for_status()
+            answered = time.perf_counter()
+        finally:
+            await app.router.shutdown()
+        return {
+            "import": imported - started,
+            "startup": ready - imported,
+            "first_request": answered - ready,
+            "total": answered - started,
+        }
+
+    print(json.dumps(asyncio.run(boot())))
+
+
+def prepare() -> str:
+    """Migrate a temporary database, add one user and return an access token for it."""
+    from benchmarks.common import use_temp_database
+
+    use_temp_database("startup.db")
+    os.environ["PASSWORD_POOL_SIZE"] = "1"
+
+    from app.crud import other as crud_other
+    from app.db.migrations import upgrade_database
+    from app.db.session import SessionLocal, engine
+    from app.models.user import User
+    from app.utils.security import create_access_token
+
+    upgrade_database(engine)
+    db = SessionLocal()
+    try:
+        db.add(User(user_id=1, username="boot", email="boot@example.com", phone_number="5550000000",
+                    password_hash="x", login_method="email"))
+        db.commit()
+        crud_other.create_login_record(db, user_id=1, username="boot", email="boot@example.com",
+                                       login_method="email", ip_address="127.0.0.1", is_active=True)
+    finally:
+        db.close()
+    token, _ = create_access_token("1", {"username": "boot", "email": "boot@example.com"})
+    return token
+
+
+def sample(variant: str, token: str) -> dict:
+    env = dict(os.environ, DB_SCHEMA_CHECK="off" if variant == "nocheck" else "warn")
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", variant, "--token", token],
+        env=env, check=True, capture_output=True, text=True,
+    )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    # Includes interpreter start and teardown, which the in-process timings can't see
+    result["process"] = time.perf_counter() - started
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=5, help="fresh processes per variant")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--child", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--token", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.token)
+        return
+
+    from benchmarks.common import percentiles, write_json
+
+    token = prepare()
+    results = {}
+    print(f"{'variant':<8} " + " ".join(f"{phase + ' p50 ms':>18}" for phase in PHASES + ("process",)))
+    for variant in args.variants:
+        runs = [sample(variant, token) for _ in range(args.samples)]
+        results[variant] = {
+            phase: percentiles(run[phase] for run in runs) for phase in PHASES + ("process",)
+        }
+        print(f"{variant:<8} " + " ".join(
+            f"{results[variant][phase]['p50_ms']:>18.1f}" for phase in PHASES + ("process",)
+        ))
+
+    write_json(args.json_path, {
+        "config": {"samples": args.samples, "variants": args.variants},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
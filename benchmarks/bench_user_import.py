@@ -0,0 +1,109 @@
+"""Bulk import throughput against /auth/signup.
+
+Generates N users, creates half of them through /auth/signup (in-process,
+httpx ASGITransport, `--concurrency` requests in flight) and imports the
+other half with UserImporter, then reports users/second for each.
+
+bcrypt dominates both paths, so the gap mostly comes from the hashing
+parallelism; pass `--rounds 4` to see the per-row database and HTTP
+overhead on its own. Needs httpx (`pip install httpx`).
+
+    python -m benchmarks.bench_user_import --users 2000 --workers 4 --json import.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks.common import use_temp_database, write_json
+
+PASSWORD = "benchmark-password"
+
+
+def user_row(prefix: str, i: int) -> dict:
+    return {
+        "username": f"{prefix}{i}", "email": f"{prefix}{i}@example.com",
+        "phone_number": "5550000000", "password": PASSWORD,
+    }
+
+
+async def signup_all(app, rows: list[dict], concurrency: int) -> float:
+    import httpx
+
+    pending = iter(rows)
+
+    async def worker(client):
+        for row in pending:
+            response = await client.post(
+                "/auth/signup", json={**row, "confirm_password": PASSWORD, "login_method": "email"}
+            )
+            response.raise_for_status()
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            return time.perf_counter() - started
+    finally:
+        await app.router.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="users per path")
+    parser.add_argument("--workers", type=int, default=0, help="hashing processes (0 = one per CPU core)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="signup requests in flight")
+    parser.add_argument("--rounds", type=int, help="override BCRYPT_ROUNDS for both paths")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    if args.rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    use_temp_database("user_import.db")
+
+    from app.db.migrations import upgrade_database
+    from app.db.session import engine
+    from app.db.user_import import UserImporter
+    from app.main import create_app
+
+    upgrade_database(engine)
+
+    signup_seconds = asyncio.run(
+        signup_all(create_app(), [user_row("api", i) for i in range(args.users)], args.concurrency)
+    )
+
+    source = os.path.join(tempfile.mkdtemp(prefix="webbuilder-import-"), "users.jsonl")
+    with open(source, "w", encoding="utf-8") as fh:
+        for i in range(args.users):
+            fh.write(json.dumps(user_row("bulk", i)) + "\n")
+    report = UserImporter(engine, source, chunk_size=args.chunk_size, workers=args.workers).run()
+    if report.imported != args.users:
+        sys.exit(f"imported {report.imported} of {args.users} users")
+
+    results = {
+        "signup": {"users": args.users, "seconds": signup_seconds, "users_per_second": args.users / signup_seconds},
+        "import": {"users": report.imported, "seconds": report.seconds, "users_per_second": report.rows_per_second},
+    }
+    results["speedup"] = results["import"]["users_per_second"] / results["signup"]["users_per_second"]
+    print(f"{'path':<8} {'users/s':>10} {'seconds':>9}")
+    for name in ("signup", "import"):
+        print(f"{name:<8} {results[name]['users_per_second']:>10.1f} {results[name]['seconds']:>9.2f}")
+    print(f"speedup  {results['speedup']:>10.1f}x")
+
+    write_json(args.json_path, {
+        "config": {k: v for k, v in vars(args).items() if k != "json_path"},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
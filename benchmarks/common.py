@@ -0,0 +1,53 @@
+"""Shared helpers for the scripts in this directory.
+
+Settings are read from the environment when `app` is first imported, so
+call `use_temp_database()` before importing anything from `app`.
+"""
+import json
+import os
+import statistics
+import tempfile
+from typing import Any, Dict, Iterable
+
+
+def use_temp_database(name: str = "bench.db") -> str:
+    # Point the app at a throwaway SQLite file; returns the file path
+    path = os.path.join(tempfile.mkdtemp(prefix="webbuilder-bench-"), name)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("AUDIT_FILE_PATH", os.path.join(os.path.dirname(path), "audit-{worker}.ndjson"))
+    # Logouts append to the revocation log; a dev server in this checkout would replay them
+    os.environ.setdefault("REVOCATION_LIST_PATH", os.path.join(os.path.dirname(path), "revocations.log"))
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+    os.environ.setdefault("DEBUG", "false")
+    # Benchmarks build their schema with create_all(), which has no Alembic revision
+    os.environ.setdefault("DB_SCHEMA_CHECK", "off")
+    # Every simulated client shares one IP, so the login throttle would dominate the numbers
+    os.environ.setdefault("LOGIN_RATE_LIMIT_BACKEND", "off")
+    return path
+
+
+def percentiles(samples: Iterable[float]) -> Dict[str, float]:
+    # Latency summary in milliseconds from samples in seconds
+    data = sorted(samples)
+    if not data:
+        return {"count": 0}
+
+    def pick(q: float) -> float:
+        return data[min(len(data) - 1, int(q * len(data)))] * 1000
+
+    return {
+        "count": len(data),
+        "mean_ms": statistics.fmean(data) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": data[-1] * 1000,
+    }
+
+
+def write_json(path: str | None, results: Any) -> None:
+    if not path:
+        return
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True, default=str)
+    print(f"results written to {path}")
@@ -0,0 +1,59 @@
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Median wall time of one bcrypt hash at `rounds`, in milliseconds."""
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int = 5, start_rounds: int = 10) -> tuple[int, dict[int, float]]:
+    """Highest rounds whose median hash time stays within `target_ms`.
+
+    Each extra round doubles the cost, so measuring stops at the first
+    setting over the target.
+    """
+    results: dict[int, float] = {}
+    rounds = start_rounds
+    while rounds >= MIN_ROUNDS:
+        results[rounds] = measure(rounds, samples)
+        if results[rounds] <= target_ms:
+            break
+        rounds -= 1
+    chosen = max(rounds, MIN_ROUNDS)
+    while chosen < MAX_ROUNDS:
+        results[chosen + 1] = measure(chosen + 1, samples)
+        if results[chosen + 1] > target_ms:
+            break
+        chosen += 1
+    return chosen, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick BCRYPT_ROUNDS for this host from a target hash latency")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="acceptable time for one hash")
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per setting")
+    parser.add_argument("--start-rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    chosen, results = calibrate(args.target_ms, args.samples, args.start_rounds)
+    for rounds in sorted(results):
+        marker = "  <-" if rounds == chosen else ""
+        print(f"rounds={rounds:2d}  {results[rounds]:8.1f} ms{marker}")
+    print(f"\nBCRYPT_ROUNDS={chosen}")
+    print(
+        f"Login throughput is bounded by about {1000 / results[chosen]:.1f} hashes/s per "
+        "password pool worker at this setting."
+    )
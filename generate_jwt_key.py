@@ -0,0 +1,38 @@
+import argparse
+import os
+from datetime import datetime, timezone
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core.config import settings
+
+
+def generate_key(algorithm: str):
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a JWT signing key in JWT_KEY_DIR")
+    parser.add_argument("--algorithm", choices=("EdDSA", "ES256"), default="EdDSA")
+    parser.add_argument("--kid", help="default: UTC timestamp, so newer keys sort last")
+    parser.add_argument("--key-dir", default=settings.JWT_KEY_DIR)
+    args = parser.parse_args()
+
+    kid = args.kid or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    os.makedirs(args.key_dir, mode=0o700, exist_ok=True)
+    path = os.path.join(args.key_dir, f"{kid}.pem")
+    pem = generate_key(args.algorithm).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    # O_EXCL: never overwrite a key that may already be signing tokens
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(pem)
+    print(f"Wrote {args.algorithm} key {kid} to {path}")
+    print(
+        "Copy it to every worker while JWT_ACTIVE_KID still names the current key, then point "
+        f"JWT_ACTIVE_KID at {kid}. Without JWT_ACTIVE_KID the last kid in sort order signs."
+    )
@@ -0,0 +1,37 @@
+import argparse
+import logging
+
+from app.db.session import engine
+from app.db.user_import import UserImporter
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-create users from a CSV (with header) or JSONL file")
+    parser.add_argument("source", help="username, email, phone_number, password[, login_method] per row")
+    parser.add_argument("--format", dest="file_format", choices=("csv", "jsonl"), help="default: from the extension")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per transaction")
+    parser.add_argument("--workers", type=int, default=0, help="hashing processes (0 = one per CPU core)")
+    parser.add_argument("--checkpoint", dest="checkpoint_path", help="default: <source>.import-checkpoint.json")
+    parser.add_argument("--report", dest="report_path", help="rejected rows CSV; default: <source>.rejected.csv")
+    parser.add_argument("--login-method", default="email", help="for rows without one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    importer = UserImporter(
+        engine,
+        args.source,
+        file_format=args.file_format,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint_path,
+        report_path=args.report_path,
+        login_method=args.login_method,
+    )
+    report = importer.run()
+    if report.resumed_from:
+        print(f"Resumed after input line {report.resumed_from}")
+    print(
+        f"Imported {report.imported} users in {report.chunks} chunks ({report.rows_per_second:.1f}/s); "
+        f"{report.duplicates} duplicates, {report.invalid} invalid rows"
+    )
+    if report.duplicates or report.invalid:
+        print(f"Rejected rows: {importer.report_path}")
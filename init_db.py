@@ -1,4 +1,5 @@
 from app.db.base import Base
+from app.db.migrations import stamp_database
 from app.db.session import engine
 
 def init_db():
@@ -7,6 +8,9 @@ def init_db():
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
+
+    # The fresh schema is the current head; record that so prestart.py and the boot check agree
+    stamp_database("head")
     print("Database tables recreated successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+import argparse
+import logging
+
+from app.db.migrations import upgrade_database
+from app.db.session import engine
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Apply database migrations; run once before starting the app workers"
+    )
+    parser.add_argument("--revision", default="head", help="target Alembic revision")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    upgrade_database(engine, args.revision)
+    print(f"Database upgraded to {args.revision}")
@@ -0,0 +1,21 @@
+import argparse
+
+from app.crud.other import reconcile_session_counters
+from app.db.session import SessionLocal
+
+
+def reconcile(chunk_size: int = 5000) -> int:
+    db = SessionLocal()
+    try:
+        return reconcile_session_counters(db, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute users.active_session_count and last_login_at from login_records")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="user_id range per UPDATE")
+    args = parser.parse_args()
+
+    updated = reconcile(args.chunk_size)
+    print(f"Reconciled session counters for {updated} users")
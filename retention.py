@@ -0,0 +1,39 @@
+import argparse
+
+from app.db.retention import login_record_retention
+from app.db.session import SessionLocal
+
+
+def run_retention(max_batches: int | None = None, max_runtime: float | None = None, **overrides):
+    # Passed to the constructor so derived values (min_chunk_size) follow the overrides
+    job = login_record_retention(
+        SessionLocal, **{key: value for key, value in overrides.items() if value is not None}
+    )
+    return job.run(max_batches=max_batches, max_runtime_seconds=max_runtime)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive and delete old inactive login records")
+    parser.add_argument("--max-age-days", dest="max_age_days", type=int)
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int)
+    parser.add_argument("--archive-dir", dest="archive_dir")
+    parser.add_argument("--max-batch-seconds", dest="max_batch_seconds", type=float)
+    parser.add_argument("--pause-ratio", dest="pause_ratio", type=float)
+    parser.add_argument("--max-batches", type=int, help="stop after N chunks (resumable)")
+    parser.add_argument("--max-runtime", type=float, help="stop after N seconds (resumable)")
+    args = parser.parse_args()
+
+    report = run_retention(
+        args.max_batches,
+        args.max_runtime,
+        max_age_days=args.max_age_days,
+        chunk_size=args.chunk_size,
+        archive_dir=args.archive_dir,
+        max_batch_seconds=args.max_batch_seconds,
+        pause_ratio=args.pause_ratio,
+    )
+    if report.skipped:
+        print("Another retention run holds the lock; nothing done")
+    else:
+        state = "finished" if report.finished else "paused (run again to resume)"
+        print(f"Archived and deleted {report.archived} login records in {report.batches} batches; {state}")
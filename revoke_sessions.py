@@ -0,0 +1,32 @@
+import argparse
+import sys
+
+from app.crud import other as crud_other
+from app.db.session import SessionLocal
+
+
+def read_user_ids(args) -> list[int]:
+    user_ids = list(args.user_ids)
+    if args.file:
+        with (sys.stdin if args.file == "-" else open(args.file)) as fh:
+            user_ids.extend(int(line) for line in fh if line.strip())
+    return user_ids
+
+
+def revoke_sessions(user_ids: list[int], chunk_size: int) -> int:
+    db = SessionLocal()
+    try:
+        return crud_other.logout_users(db, user_ids, chunk_size=chunk_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log out every active session of the given users")
+    parser.add_argument("user_ids", nargs="*", type=int)
+    parser.add_argument("--file", help="file with one user id per line ('-' for stdin)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    closed = revoke_sessions(read_user_ids(args), args.chunk_size)
+    print(f"Closed {closed} active sessions")